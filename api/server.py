@@ -1,15 +1,19 @@
+import asyncio
 import orjson
 import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, suppress
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, Deque, Iterable, List, Dict, Any, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Body
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Body, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 
-# Add project root to path to allow imports from other modules
 import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from detector.config import ConfigLoader
 from detector.event_model import Event
@@ -20,6 +24,7 @@ from worker.prompts import SINGLE_EVENT_ANALYSIS_PROMPT
 try:
     config = ConfigLoader()
     api_config = config.get_api_config()
+    api_enabled = bool(api_config.get("enabled", False))
     worker_config = config.get_worker_config()
     events_dir = Path("clearwatch") / config.get("events.dir", "events")
 except Exception as e:
@@ -28,15 +33,38 @@ except Exception as e:
     sys.exit(1)
 
 # --- FastAPI App Initialization ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Keeps the recent event cache warm in the background while the app runs."""
+    global _cache_warmed_in_background
+    if not api_enabled:
+        yield
+        return
+
+    # Prime the cache before serving so the first request isn't empty
+    await asyncio.to_thread(_refresh_recent_cache_locked)
+    task = asyncio.create_task(_tail_watcher())
+    _cache_warmed_in_background = True
+    try:
+        yield
+    finally:
+        _cache_warmed_in_background = False
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
 app = FastAPI(
     title="Clearwatch API",
     description="API for querying security events and getting LLM-powered analysis.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # --- LLM Client Initialization ---
 llm_client: Optional[OllamaClient] = None
-if api_config.get("enabled", False) and worker_config.get("enabled", False):
+if api_enabled and worker_config.get("enabled", False):
     try:
         llm_client = OllamaClient(model=worker_config.get("model"))
     except Exception as e:
@@ -51,33 +79,203 @@ class ErrorResponse(BaseModel):
     detail: str
 
 
+# Built once and reused so validation doesn't repeat the schema lookup per request
+_event_adapter = TypeAdapter(Event)
+
+
+# --- Recent Event Cache ---
+# Event files are append-only, so rather than re-reading them on every request
+# we remember how far into each file we have read and only parse new bytes.
+RECENT_CACHE_SIZE = 1000
+_recent_cache: Deque[Dict[str, Any]] = deque(maxlen=RECENT_CACHE_SIZE)
+_tail_state: Dict[str, Tuple[int, int]] = {}  # path -> (inode, offset)
+_cache_lock = threading.Lock()  # Requests are served from a thread pool
+TAIL_POLL_INTERVAL = 0.5  # seconds
+_cache_warmed_in_background = False
+
+
+# --- Explanation Cache ---
+# Alerts cluster heavily (same rule between the same hosts), so identical
+# alerts reuse an earlier LLM explanation instead of asking Ollama again.
+EXPLANATION_CACHE_SIZE = 1024
+_EXPLANATION_KEY_FIELDS = ("rule", "src_ip", "dst_ip", "host", "context")
+_explanation_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
+
 # --- Helper Functions ---
+def _explanation_key(event: Dict[str, Any]) -> bytes:
+    """Keys an explanation on the fields that shape it, ignoring timestamps and ports."""
+    return orjson.dumps(
+        {field: event.get(field) for field in _EXPLANATION_KEY_FIELDS},
+        option=orjson.OPT_SORT_KEYS,
+    )
+
+
+def _get_cached_explanation(key: bytes) -> Optional[str]:
+    explanation = _explanation_cache.get(key)
+    if explanation is not None:
+        _explanation_cache.move_to_end(key)
+    return explanation
+
+
+def _cache_explanation(key: bytes, explanation: str) -> None:
+    _explanation_cache[key] = explanation
+    _explanation_cache.move_to_end(key)
+    if len(_explanation_cache) > EXPLANATION_CACHE_SIZE:
+        _explanation_cache.popitem(last=False)
+
+
+def tail_lines(path, n: int, block_size: int = 64 * 1024) -> Tuple[List[bytes], int]:
+    """
+    Reads the last ``n`` complete lines of a file by seeking backwards in blocks.
+
+    Returns the lines in file order, along with the offset just past the last one.
+    """
+    with open(path, "rb") as f:
+        pos = os.fstat(f.fileno()).st_size
+        buf = b""
+        end = None
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            buf = f.read(read_size) + buf
+            if end is None:
+                # Drop a partially written trailing line
+                nl = buf.rfind(b"\n")
+                if nl == -1:
+                    continue
+                end = pos + nl + 1
+                buf = buf[:nl + 1]
+            if buf.count(b"\n") > n:
+                break
+
+    if end is None:
+        return [], 0
+
+    lines = buf.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # The first line may have been cut by the block boundary
+    return lines[-n:], end
+
+
+def _decode_lines(lines: Iterable[bytes], append: Callable[[Any], None]) -> None:
+    """Decodes JSON lines into ``append``, skipping any that are malformed."""
+    # Bind the hot callables to locals once rather than per line
+    loads = orjson.loads
+    decode_error = orjson.JSONDecodeError
+    for line in lines:
+        try:
+            append(loads(line))
+        except decode_error:
+            continue
+
+
+def _scan_event_files() -> List[os.DirEntry]:
+    """Lists event files sorted oldest first, with one stat() per file."""
+    with os.scandir(events_dir) as it:
+        entries = [e for e in it if e.name.endswith(".jsonl") and e.is_file()]
+    # DirEntry caches its stat() result, so sorting doesn't re-stat
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    return entries
+
+
+def _refresh_recent_cache() -> None:
+    """Append events written since the last refresh to the recent event cache."""
+    try:
+        # Oldest first, so the newest events end up at the right of the deque
+        entries = _scan_event_files()
+    except OSError:
+        return
+
+    seen = set()
+    for entry in entries:
+        seen.add(entry.path)
+        try:
+            inode = entry.inode()
+            size = entry.stat().st_size
+        except OSError:
+            continue
+
+        prev_inode, offset = _tail_state.get(entry.path, (inode, 0))
+        if prev_inode != inode or size < offset:
+            offset = 0  # File was replaced or truncated, start over
+        if size == offset:
+            _tail_state[entry.path] = (inode, offset)
+            continue
+
+        try:
+            if offset == 0:
+                # First look at this file: only its tail can survive in the cache
+                lines, offset = tail_lines(entry.path, RECENT_CACHE_SIZE)
+            else:
+                with open(entry.path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(size - offset)
+                # Only consume complete lines; a partial trailing line is picked up next time
+                end = data.rfind(b"\n") + 1
+                lines = data[:end].splitlines()
+                offset += end
+        except OSError:
+            continue
+
+        _decode_lines(lines, _recent_cache.append)
+        _tail_state[entry.path] = (inode, offset)
+
+    # Forget files that have been removed
+    for path in list(_tail_state):
+        if path not in seen:
+            del _tail_state[path]
+
+
 def read_recent_events(limit: int) -> List[Dict[str, Any]]:
+    """Returns the most recent events, newest first."""
+    if limit <= 0 or not events_dir.exists():
+        return []
+
+    if limit <= RECENT_CACHE_SIZE:
+        with _cache_lock:
+            # The background watcher keeps the cache current; only refresh
+            # here when it isn't running (e.g. when called outside the app)
+            if not _cache_warmed_in_background:
+                _refresh_recent_cache()
+            return list(islice(reversed(_recent_cache), limit))
+
+    return _read_events_from_disk(limit)
+
+
+def _refresh_recent_cache_locked() -> None:
+    with _cache_lock:
+        _refresh_recent_cache()
+
+
+async def _tail_watcher() -> None:
+    """Polls the event files and appends new events to the recent event cache."""
+    while True:
+        await asyncio.sleep(TAIL_POLL_INTERVAL)
+        try:
+            await asyncio.to_thread(_refresh_recent_cache_locked)
+        except Exception as e:
+            logging.warning(f"Failed to refresh recent events: {e}")
+
+
+def _read_events_from_disk(limit: int) -> List[Dict[str, Any]]:
     """Reads the most recent events from .jsonl files."""
     events = []
-    if not events_dir.exists():
-        return []
 
     # Get all event files, sorted by modification time (newest first)
     try:
-        event_files = sorted(events_dir.glob("*.jsonl"), key=os.path.getmtime, reverse=True)
-    except Exception:
-        return [] # In case of race condition where a file is deleted during sort
+        event_files = reversed(_scan_event_files())
+    except OSError:
+        return [] # In case of race condition where a file is deleted during the scan
 
-    for file_path in event_files:
+    for entry in event_files:
         if len(events) >= limit:
             break
         try:
-            with open(file_path, "rb") as f:
-                lines = f.readlines()
-                # Read lines from the end of the file to get the most recent events first
-                for line in reversed(lines):
-                    if len(events) >= limit:
-                        break
-                    try:
-                        events.append(orjson.loads(line))
-                    except orjson.JSONDecodeError:
-                        continue
+            lines, _ = tail_lines(entry.path, limit - len(events))
+            # Read lines from the end of the file to get the most recent events first
+            _decode_lines(reversed(lines), events.append)
         except IOError:
             continue
             
@@ -91,17 +289,18 @@ def read_recent_events(limit: int) -> List[Dict[str, Any]]:
     summary="Get Recent Security Alerts",
     description="Returns a list of the most recent security events detected, sorted from newest to oldest.",
 )
-async def get_recent_alerts(limit: int = 100):
+async def get_recent_alerts(limit: int = Query(100, ge=1)):
     """
     Retrieves the most recent security alerts.
 
     - **limit**: The maximum number of alerts to return.
     """
-    if not api_config.get("enabled", False):
+    if not api_enabled:
         raise HTTPException(status_code=404, detail="API is not enabled in the configuration.")
         
     try:
-        recent_events = read_recent_events(limit)
+        # File reads are blocking, keep them off the event loop
+        recent_events = await asyncio.to_thread(read_recent_events, limit)
         return recent_events
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read event files: {e}")
@@ -121,28 +320,37 @@ async def explain_alert(request: AlertExplanationRequest):
     """
     Provides an LLM-powered explanation for a given security event.
     """
-    if not api_config.get("enabled", False) or not llm_client:
+    if not api_enabled or not llm_client:
         raise HTTPException(status_code=503, detail="LLM analysis is not enabled in the configuration.")
 
     # Validate the event structure using our Pydantic model
     try:
-        Event.model_validate(request.event)
+        _event_adapter.validate_python(request.event)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid event data provided: {e}")
 
-    # Check if LLM is available
-    if not llm_client.is_available():
+    cache_key = _explanation_key(request.event)
+    cached = _get_cached_explanation(cache_key)
+    if cached is not None:
+        return cached
+
+    # Check if LLM is available. The Ollama client blocks for up to its
+    # timeout, so it runs on a worker thread and the event loop keeps serving
+    # other requests, including concurrent explanations
+    if not await asyncio.to_thread(llm_client.is_available):
         raise HTTPException(status_code=503, detail="The Ollama LLM service is currently unavailable.")
 
     # Generate the explanation
-    explanation = llm_client.ask_single_event(
+    explanation = await asyncio.to_thread(
+        llm_client.ask_single_event,
         event=request.event,
-        prompt_template=SINGLE_EVENT_ANALYSIS_PROMPT
+        prompt_template=SINGLE_EVENT_ANALYSIS_PROMPT,
     )
 
     if not explanation:
         raise HTTPException(status_code=500, detail="Failed to get a valid response from the LLM.")
 
+    _cache_explanation(cache_key, explanation)
     return explanation
 
 # --- Root Endpoint ---
@@ -151,12 +359,24 @@ async def root():
     return {"status": "running", "title": "Clearwatch API"}
 
 # --- Uvicorn Runner ---
+# Run from the project root as a module: python -m api.server
 if __name__ == "__main__":
     import uvicorn
-    if api_config.get("enabled", False):
+    if api_enabled:
         host = api_config.get("host", "127.0.0.1")
         port = api_config.get("port", 8088)
-        print(f"Starting Clearwatch API server on http://{host}:{port}")
-        uvicorn.run(app, host=host, port=port)
+        workers = api_config.get("workers", (os.cpu_count() or 1) * 2 + 1)
+        print(f"Starting Clearwatch API server on http://{host}:{port} ({workers} workers)")
+        # Multiple workers require an import string rather than the app object.
+        # loop/http "auto" pick uvloop and httptools (uvicorn[standard]) where available.
+        uvicorn.run(
+            "api.server:app",
+            host=host,
+            port=port,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            log_level="warning",
+        )
     else:
         print("API server is disabled in the configuration. Exiting.")
@@ -5,8 +5,9 @@ Quick Clearwatch Status Checker
 This script quickly checks if Clearwatch is working properly.
 """
 
-import json
+import orjson
 import os
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
@@ -49,44 +50,41 @@ def check_clearwatch_status():
     
     # Check event files
     if events_dir.exists():
-        event_files = list(events_dir.glob("*.jsonl"))
+        with os.scandir(events_dir) as it:
+            event_files = [e for e in it if e.name.endswith(".jsonl") and e.is_file()]
         print("📊 Event Files Status:")
         if event_files:
             print(f"   ✅ {len(event_files)} event files found")
             
             # Analyze latest file
-            latest_file = max(event_files, key=os.path.getmtime)
+            latest_file = max(event_files, key=lambda e: e.stat().st_mtime)
             print(f"   📄 Latest file: {latest_file.name}")
             
             try:
-                with open(latest_file, 'r') as f:
-                    events = []
+                # Stream the file, only keeping per-severity and per-rule counts
+                severity_count = Counter()
+                rule_count = Counter()
+                with open(latest_file, 'rb') as f:
                     for line in f:
                         if line.strip():
-                            events.append(json.loads(line))
-                    
-                    if events:
-                        print(f"   📈 {len(events)} events in latest file")
-                        
-                        # Show event breakdown
-                        severity_count = {}
-                        rule_count = {}
-                        for event in events:
-                            severity = event.get('severity', 'UNKNOWN')
-                            rule = event.get('rule', 'unknown')
-                            severity_count[severity] = severity_count.get(severity, 0) + 1
-                            rule_count[rule] = rule_count.get(rule, 0) + 1
-                        
-                        print("   📋 Event breakdown:")
-                        for severity, count in severity_count.items():
-                            emoji = {'HIGH': '🔴', 'MED': '🟡', 'LOW': '🔵'}.get(severity, '⚪')
-                            print(f"      {emoji} {severity}: {count}")
-                        
-                        print("   📋 Rules detected:")
-                        for rule, count in rule_count.items():
-                            print(f"      • {rule}: {count}")
-                    else:
-                        print("   📭 No events in latest file")
+                            event = orjson.loads(line)
+                            severity_count[event.get('severity', 'UNKNOWN')] += 1
+                            rule_count[event.get('rule', 'unknown')] += 1
+
+                total_events = sum(severity_count.values())
+                if total_events:
+                    print(f"   📈 {total_events} events in latest file")
+
+                    print("   📋 Event breakdown:")
+                    for severity, count in severity_count.items():
+                        emoji = {'HIGH': '🔴', 'MED': '🟡', 'LOW': '🔵'}.get(severity, '⚪')
+                        print(f"      {emoji} {severity}: {count}")
+
+                    print("   📋 Rules detected:")
+                    for rule, count in rule_count.items():
+                        print(f"      • {rule}: {count}")
+                else:
+                    print("   📭 No events in latest file")
             except Exception as e:
                 print(f"   ❌ Error reading events: {e}")
         else:
@@ -12,7 +12,9 @@ class ConfigLoader:
     def __init__(self, config_dir: str = "config"):
         self.config_dir = Path(config_dir)
         self.config: Dict[str, Any] = {}
+        self._flat: Dict[str, Any] = {}
         self._load_config()
+        self._flatten(self.config)
 
     def _load_config(self):
         """Load configuration based on platform."""
@@ -69,17 +71,17 @@ class ConfigLoader:
 
         logger.info("Configuration validation passed")
 
+    def _flatten(self, node: Dict[str, Any], prefix: str = ""):
+        """Index every value (sections included) by its dot-notation path."""
+        for k, v in node.items():
+            path = f"{prefix}{k}"
+            self._flat[path] = v
+            if isinstance(v, dict):
+                self._flatten(v, f"{path}.")
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation (e.g., 'detector.interface')."""
-        keys = key.split(".")
-        value = self.config
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key, default)
 
     def get_detector_config(self) -> Dict[str, Any]:
         """Get detector configuration section."""
@@ -1,29 +1,76 @@
-from pydantic import BaseModel, Field, IPvAnyAddress, conint
-from typing import Literal, Optional, List, Dict
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, IPvAnyAddress
+from typing import Annotated, Iterable, Literal, Optional, List, Dict
+from datetime import datetime, timezone
+from functools import lru_cache
 import hashlib
+import orjson
 
 
 Severity = Literal["LOW", "MED", "HIGH"]
+Port = Annotated[int, Field(ge=1, le=65535)]
+
+_UTC_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# Static parts of the DNS and SMB event contexts, merged with the per-packet fields
+_DNS_TUNNELING_CONTEXT = {"protocol": "DNS", "description": "Potential DNS tunneling detected"}
+_DNS_SUSPICIOUS_QUERY_CONTEXT = {"protocol": "DNS", "description": "Suspicious DNS query detected"}
+_DNS_DATA_EXFILTRATION_CONTEXT = {"protocol": "DNS", "description": "Potential data exfiltration via DNS"}
+_SMB_PLAINTEXT_AUTH_CONTEXT = {"protocol": "SMB", "description": "Plaintext SMB authentication detected"}
+_SMB_WEAK_ENCRYPTION_CONTEXT = {"protocol": "SMB", "description": "SMB without security signatures detected"}
+_SMB_SUSPICIOUS_ACTIVITY_CONTEXT = {"protocol": "SMB", "description": "Suspicious SMB file access detected"}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def _sha256_hex(s: str) -> str:
+    """SHA-256 of a snippet; repeated bodies (same form, same API) hit the cache."""
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
 class Event(BaseModel):
+    # Events are built once by the rules and never mutated afterwards
+    model_config = ConfigDict(frozen=True, validate_assignment=False, extra="ignore")
+
     ts: datetime
     severity: Severity
     rule: str
     src_ip: IPvAnyAddress
-    src_port: conint(ge=1, le=65535)
+    src_port: Port
     dst_ip: IPvAnyAddress
-    dst_port: conint(ge=1, le=65535)
+    dst_port: Port
     host: Optional[str] = None
     context: Dict[str, str] = Field(default_factory=dict)
     snippet_sha256: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
 
     def to_jsonable(self) -> dict:
-        d = self.model_dump()
-        d["ts"] = self.ts.isoformat().replace("+00:00", "Z")
-        return d
+        # The schema is small and fixed, so build the dict directly rather
+        # than walking the model with model_dump()
+        ts = self.ts
+        if ts.tzinfo is not None and not ts.utcoffset():
+            ts_str = ts.strftime(_UTC_TS_FORMAT)
+        else:
+            ts_str = ts.isoformat()
+        return {
+            "ts": ts_str,
+            "severity": self.severity,
+            "rule": self.rule,
+            "src_ip": str(self.src_ip),
+            "src_port": self.src_port,
+            "dst_ip": str(self.dst_ip),
+            "dst_port": self.dst_port,
+            "host": self.host,
+            "context": dict(self.context),
+            "snippet_sha256": self.snippet_sha256,
+            "tags": list(self.tags),
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize as a newline-terminated JSON line, ready to append to a .jsonl file."""
+        return orjson.dumps(self.to_jsonable(), option=orjson.OPT_APPEND_NEWLINE)
 
     @classmethod
     def create_http_basic_auth(
@@ -35,7 +82,7 @@ class Event(BaseModel):
         host: Optional[str] = None,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="http.basic_auth",
             src_ip=src_ip,
@@ -54,15 +101,15 @@ class Event(BaseModel):
         dst_ip: str,
         dst_port: int,
         host: Optional[str] = None,
-        keys_found: List[str] = None,
+        keys_found: Optional[Iterable[str]] = None,
         body_snippet: Optional[str] = None,
     ) -> "Event":
         snippet_hash = None
         if body_snippet:
-            snippet_hash = hashlib.sha256(body_snippet.encode("utf-8")).hexdigest()
+            snippet_hash = _sha256_hex(body_snippet)
 
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="MED",
             rule="http.credential_key",
             src_ip=src_ip,
@@ -70,7 +117,8 @@ class Event(BaseModel):
             dst_ip=dst_ip,
             dst_port=dst_port,
             host=host,
-            context={"protocol": "HTTP", "keys": ",".join(keys_found or [])},
+            # Sorted so the same keys always produce the same context
+            context={"protocol": "HTTP", "keys": ",".join(sorted(keys_found or ()))},
             snippet_sha256=snippet_hash,
         )
 
@@ -83,7 +131,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="smtp.no_starttls",
             src_ip=src_ip,
@@ -102,7 +150,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="pop3.clear_creds",
             src_ip=src_ip,
@@ -121,7 +169,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="imap.clear_login",
             src_ip=src_ip,
@@ -140,7 +188,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="ftp.clear_creds",
             src_ip=src_ip,
@@ -159,7 +207,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="HIGH",
             rule="telnet.clear_login",
             src_ip=src_ip,
@@ -180,7 +228,7 @@ class Event(BaseModel):
         min_required: str,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="MED",
             rule="tls.weak_version",
             src_ip=src_ip,
@@ -203,7 +251,7 @@ class Event(BaseModel):
         dst_port: int,
     ) -> "Event":
         return cls(
-            ts=datetime.now(),
+            ts=_utcnow(),
             severity="LOW",
             rule="tls.missing_sni",
             src_ip=src_ip,
@@ -212,3 +260,143 @@ class Event(BaseModel):
             dst_port=dst_port,
             context={"protocol": "TLS"},
         )
+
+    @classmethod
+    def create_dns_tunneling(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        query_name: str,
+        query_type: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="HIGH",
+            rule="dns.tunneling",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={
+                **_DNS_TUNNELING_CONTEXT,
+                "query_name": query_name,
+                "query_type": query_type,
+                "query_length": str(len(query_name)),
+            },
+            tags=["dns", "tunneling", "exfiltration"],
+        )
+
+    @classmethod
+    def create_dns_suspicious_query(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        query_name: str,
+        query_type: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="MED",
+            rule="dns.suspicious_query",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={**_DNS_SUSPICIOUS_QUERY_CONTEXT, "query_name": query_name, "query_type": query_type},
+            tags=["dns", "suspicious", "malware"],
+        )
+
+    @classmethod
+    def create_dns_data_exfiltration(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        query_name: str,
+        query_type: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="HIGH",
+            rule="dns.data_exfiltration",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={**_DNS_DATA_EXFILTRATION_CONTEXT, "query_name": query_name, "query_type": query_type},
+            tags=["dns", "exfiltration", "data_leak"],
+        )
+
+    @classmethod
+    def create_smb_plaintext_auth(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        smb_cmd: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="HIGH",
+            rule="smb.plaintext_auth",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={**_SMB_PLAINTEXT_AUTH_CONTEXT, "smb_cmd": smb_cmd},
+            tags=["smb", "authentication", "plaintext"],
+        )
+
+    @classmethod
+    def create_smb_weak_encryption(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        smb_cmd: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="MED",
+            rule="smb.weak_encryption",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={**_SMB_WEAK_ENCRYPTION_CONTEXT, "smb_cmd": smb_cmd},
+            tags=["smb", "encryption", "security"],
+        )
+
+    @classmethod
+    def create_smb_suspicious_activity(
+        cls,
+        ts: datetime,
+        src_ip: str,
+        src_port: int,
+        dst_ip: str,
+        dst_port: int,
+        smb_cmd: str,
+    ) -> "Event":
+        return cls(
+            ts=ts,
+            severity="MED",
+            rule="smb.suspicious_activity",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={**_SMB_SUSPICIOUS_ACTIVITY_CONTEXT, "smb_cmd": smb_cmd},
+            tags=["smb", "suspicious", "file_access"],
+        )
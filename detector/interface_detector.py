@@ -6,8 +6,10 @@ This module provides functionality to automatically detect the best network inte
 for packet capture, prioritizing active interfaces with internet connectivity.
 """
 
+import asyncio
 import subprocess
 import re
+import time
 import logging
 from typing import List, Dict, Optional, Tuple
 
@@ -16,12 +18,43 @@ logger = logging.getLogger(__name__)
 
 class InterfaceDetector:
     """Detects and manages network interfaces for packet capture."""
+
+    # tshark -D output format: "5. \Device\NPF_{...} (Wi-Fi)"
+    _IFACE_RE = re.compile(r'(\d+)\.\s+(.+?)\s+\((.+?)\)')
+    # netsh columns: "Admin State  State  Type  Interface Name" (name may contain spaces)
+    _NETSH_RE = re.compile(r'(\S+)\s+\S+\s+\S+\s+(.+?)\s*$')
+
+    # Interfaces rarely change while we run, so subprocess results are shared
+    # across instances for CACHE_TTL seconds (see invalidate()).
+    CACHE_TTL = 300
+    _cache: Dict[Tuple[str, str], Tuple[float, List[Dict[str, str]]]] = {}
     
     def __init__(self, tshark_path: str):
         self.tshark_path = tshark_path
+
+    @classmethod
+    def invalidate(cls):
+        """Drop cached interface lists so the next lookup re-queries the system."""
+        cls._cache.clear()
+
+    def _get_cached(self, key: Tuple[str, str]) -> Optional[List[Dict[str, str]]]:
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.CACHE_TTL:
+            return entry[1]
+        return None
+
+    def _set_cached(self, key: Tuple[str, str], interfaces: List[Dict[str, str]]):
+        # Failed lookups come back empty; don't let them stick
+        if interfaces:
+            self._cache[key] = (time.monotonic(), interfaces)
         
     def get_available_interfaces(self) -> List[Dict[str, str]]:
         """Get list of available network interfaces from tshark."""
+        cache_key = ("tshark", self.tshark_path)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             result = subprocess.run(
                 [self.tshark_path, "-D"],
@@ -35,9 +68,8 @@ class InterfaceDetector:
                 return []
                 
             interfaces = []
-            for line in result.stdout.strip().split('\n'):
-                # Parse tshark -D output format: "5. \Device\NPF_{...} (Wi-Fi)"
-                match = re.match(r'(\d+)\.\s+(.+?)\s+\((.+?)\)', line)
+            for line in result.stdout.splitlines():
+                match = self._IFACE_RE.match(line)
                 if match:
                     interfaces.append({
                         'number': match.group(1),
@@ -45,6 +77,7 @@ class InterfaceDetector:
                         'name': match.group(3)
                     })
                     
+            self._set_cached(cache_key, interfaces)
             return interfaces
             
         except subprocess.TimeoutExpired:
@@ -56,6 +89,11 @@ class InterfaceDetector:
     
     def get_active_interfaces(self) -> List[Dict[str, str]]:
         """Get list of active network interfaces using netsh."""
+        cache_key = ("netsh", "")
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Get active network adapters
             result = subprocess.run(
@@ -70,22 +108,16 @@ class InterfaceDetector:
                 return []
                 
             active_interfaces = []
-            lines = result.stdout.strip().split('\n')
-            
-            # Skip header lines
-            for line in lines[3:]:  # Skip first 3 header lines
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        state = parts[0]
-                        name = ' '.join(parts[3:])  # Name might contain spaces
-                        
-                        if state == "Enabled":
-                            active_interfaces.append({
-                                'name': name,
-                                'state': state
-                            })
+            # Header and separator lines never match with an "Enabled" state
+            for line in result.stdout.splitlines():
+                match = self._NETSH_RE.match(line)
+                if match and match.group(1) == "Enabled":
+                    active_interfaces.append({
+                        'name': match.group(2),
+                        'state': match.group(1)
+                    })
                             
+            self._set_cached(cache_key, active_interfaces)
             return active_interfaces
             
         except subprocess.TimeoutExpired:
@@ -149,27 +181,41 @@ class InterfaceDetector:
         logger.warning(f"No active interfaces found, using first available: {available_interfaces[0]['name']}")
         return available_interfaces[0]['name']
     
-    def test_interface(self, interface_name: str) -> bool:
+    async def test_interface(self, interface_name: str) -> bool:
         """Test if an interface can capture packets."""
+        proc = None
         try:
-            # Try to capture 1 packet with a 5-second timeout
-            result = subprocess.run(
-                [self.tshark_path, "-i", interface_name, "-c", "1", "-T", "json"],
-                capture_output=True,
-                text=True,
-                timeout=5
+            # Try to capture 1 packet with a 5-second timeout; the packet itself
+            # is discarded, so skip JSON output and keep tshark quiet
+            proc = await asyncio.create_subprocess_exec(
+                self.tshark_path, "-Q", "-i", interface_name, "-c", "1",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
             )
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=5)
             
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 logger.info(f"Interface '{interface_name}' test successful")
                 return True
             else:
-                logger.warning(f"Interface '{interface_name}' test failed: {result.stderr}")
+                logger.warning(f"Interface '{interface_name}' test failed: {stderr.decode(errors='replace')}")
                 return False
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.warning(f"Interface '{interface_name}' test timeout")
             return False
         except Exception as e:
             logger.warning(f"Interface '{interface_name}' test error: {e}")
             return False
+        finally:
+            if proc and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    async def find_working_interface(self, interface_names: List[str]) -> Optional[str]:
+        """Test candidate interfaces concurrently and return the first (in order) that works."""
+        results = await asyncio.gather(*(self.test_interface(name) for name in interface_names))
+        for name, ok in zip(interface_names, results):
+            if ok:
+                return name
+        return None
@@ -1,11 +1,17 @@
 import subprocess
-import json
+import sys
 import ipaddress
 import logging
-from typing import Dict, Any, List, Optional, Generator
-from datetime import datetime
+import os
+import socket
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+import orjson
 
 from .event_model import Event
+from .packet import PacketInfo
 from .config import ConfigLoader
 from .rules import http_rules, smtp_rules, pop3_imap_rules, ftp_rules, telnet_rules, tls_rules, smb_rules, dns_rules
 from .interface_detector import InterfaceDetector
@@ -14,11 +20,51 @@ logger = logging.getLogger(__name__)
 
 
 class NetworkDetector:
+    # Layers every packet needs for its timestamp and addressing
+    _BASE_JSON_LAYERS = ("frame", "ip", "ipv6", "tcp")
+
+    # protocol config key -> (tshark display filter, JSON layers the rule reads)
+    _PROTOCOL_FILTERS = {
+        "http": ("http", ("http",)),
+        "smtp": ("smtp", ("smtp",)),
+        "imap_pop3": ("pop or imap", ("pop", "imap")),
+        "ftp": ("ftp", ("ftp",)),
+        "telnet": ("telnet", ("telnet",)),
+        # This filter captures the TLS handshake (ClientHello is type 1)
+        "tls": ("tls.handshake.type == 1", ("tls",)),
+        "smb": ("smb", ("smb",)),
+        "dns": ("dns", ("dns",)),
+    }
+
     def __init__(self, config: ConfigLoader, interface_override: Optional[str] = None):
         self.config = config
         self.allowlist_networks = self._build_allowlist()
-        self.credential_keys = set(config.get_credential_keys())
+        self._allowlist_ranges = self._index_allowlist(self.allowlist_networks)
+        # Destination IPs repeat heavily within a flow
+        self._is_allowlisted = lru_cache(maxsize=4096)(self._is_allowlisted)
+        self.credential_matcher = http_rules.CredentialMatcher(config.get_credential_keys())
         self.max_body_size = config.get_max_body_size()
+
+        # Configuration is fixed for the detector's lifetime, so resolve the
+        # per-protocol settings once instead of on every packet
+        self._proto_enabled = {
+            protocol: config.is_protocol_enabled(protocol) for protocol in self._PROTOCOL_FILTERS
+        }
+        tls_config = config.get("detector.protocols.tls", {})
+        self._tls_min_version_code = tls_rules.tls_version_code(tls_config.get("min_version", "1.2"))
+        self._tls_require_sni = tls_config.get("require_sni", False)
+        self._smb_detect_plaintext_auth = config.get(
+            "detector.protocols.smb.detect_plaintext_auth", True
+        )
+        self._dns_detect_tunneling = config.get("detector.protocols.dns.detect_tunneling", True)
+        # JSON layers that some enabled rule reads; packets with none are dropped early
+        self._rule_layers = frozenset(
+            layer
+            for protocol, (_, layers) in self._PROTOCOL_FILTERS.items()
+            if self._proto_enabled[protocol]
+            for layer in layers
+        )
+        self._handlers = self._build_handlers()
         
         # Initialize interface detector
         self.interface_detector = InterfaceDetector(config.get('detector.tshark_path'))
@@ -28,15 +74,16 @@ class NetworkDetector:
         
         # Build tshark command
         self.tshark_cmd = self._build_tshark_command()
+        self._capture_process: Optional[subprocess.Popen] = None
         
-        logger.info(f"Network detector initialized with interface: {self.interface}")
-        logger.info(f"Tshark path: {config.get('detector.tshark_path')}")
+        logger.info("Network detector initialized with interface: %s", self.interface)
+        logger.info("Tshark path: %s", config.get('detector.tshark_path'))
 
     def _determine_interface(self, interface_override: Optional[str] = None) -> str:
         """Determine which network interface to use for packet capture."""
         # If interface override is provided, use it
         if interface_override:
-            logger.info(f"Using interface override: {interface_override}")
+            logger.info("Using interface override: %s", interface_override)
             return interface_override
             
         # Get configured interface from config
@@ -49,7 +96,7 @@ class NetworkDetector:
             return best_interface
         else:
             # Fallback to configured interface
-            logger.warning(f"Could not auto-detect interface, using configured: {configured_interface}")
+            logger.warning("Could not auto-detect interface, using configured: %s", configured_interface)
             return configured_interface
 
     def get_available_interfaces(self) -> List[Dict[str, str]]:
@@ -67,11 +114,40 @@ class NetworkDetector:
             try:
                 network = ipaddress.ip_network(cidr, strict=False)
                 networks.append(network)
-                logger.info(f"Added allowlist network: {cidr}")
             except ValueError as e:
-                logger.warning(f"Invalid CIDR in allowlist: {cidr} - {e}")
+                logger.warning("Invalid CIDR in allowlist: %s - %s", cidr, e)
+        logger.info("Loaded %d allowlist networks", len(networks))
         return networks
 
+    @staticmethod
+    def _index_allowlist(
+        networks: List[ipaddress.IPv4Network],
+    ) -> Dict[int, Tuple[List[int], List[int]]]:
+        """
+        Compile the networks into sorted, merged integer ranges per IP version.
+
+        Each version maps to its range starts and ends as parallel lists for
+        bisect lookups.
+        """
+        ranges: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for net in networks:
+            ranges[net.version].append((int(net.network_address), int(net.broadcast_address)))
+
+        index = {}
+        for version, version_ranges in ranges.items():
+            # Merge overlapping and nested ranges so each address falls in at
+            # most one range and the nearest start below it is the only candidate
+            starts: List[int] = []
+            ends: List[int] = []
+            for start, end in sorted(version_ranges):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            index[version] = (starts, ends)
+        return index
+
     def _build_tshark_command(self) -> List[str]:
         """Build tshark command with proper options."""
         detector_config = self.config.get_detector_config()
@@ -87,51 +163,62 @@ class NetworkDetector:
             "-o", "http.desegment_body:true",
         ]
 
-        # Display filter for all enabled TCP-based protocols
+        # Display filter for all enabled TCP-based protocols, and the
+        # dissector layers the rules read from the JSON output
         display_filters = []
-        if self.config.is_protocol_enabled("http"):
-            display_filters.append("http")
-        if self.config.is_protocol_enabled("smtp"):
-            display_filters.append("smtp")
-        if self.config.is_protocol_enabled("imap_pop3"):
-            display_filters.append("pop or imap")
-        if self.config.is_protocol_enabled("ftp"):
-            display_filters.append("ftp")
-        if self.config.is_protocol_enabled("telnet"):
-            display_filters.append("telnet")
-        if self.config.is_protocol_enabled("tls"):
-            # This filter captures the TLS handshake (ClientHello is type 1)
-            display_filters.append("tls.handshake.type == 1")
-        if self.config.is_protocol_enabled("smb"):
-            display_filters.append("smb")
-        if self.config.is_protocol_enabled("dns"):
-            display_filters.append("dns")
+        json_layers = list(self._BASE_JSON_LAYERS)
+        for protocol, (display_filter, layers) in self._PROTOCOL_FILTERS.items():
+            if self._proto_enabled[protocol]:
+                display_filters.append(display_filter)
+                json_layers.extend(layers)
 
         if display_filters:
             cmd.extend(["-Y", " or ".join(display_filters)])
 
-        # Add BPF filter if specified
+        # Only emit the layers we actually inspect; the full JSON dissection of
+        # every packet is by far the largest cost of the tshark pipe
+        cmd.extend(["-J", " ".join(json_layers)])
+
+        # Add BPF filter if specified, dropping allowlisted destinations in the
+        # kernel so they never reach tshark's dissectors or our pipe
+        capture_filters = []
+        if display_filters:
+            # Packet info is read from the TCP layer, so anything else would be
+            # dissected and piped only to be discarded; drop it in the kernel
+            capture_filters.append("tcp")
         if detector_config.get("bpf"):
-            cmd.extend(["-f", detector_config["bpf"]])
+            capture_filters.append(f"({detector_config['bpf']})")
+        if self.allowlist_networks:
+            allowlist = " or ".join(f"dst net {net}" for net in self.allowlist_networks)
+            capture_filters.append(f"not ({allowlist})")
+        if capture_filters:
+            cmd.extend(["-f", " and ".join(capture_filters)])
             
         return cmd
 
     def _is_allowlisted(self, ip: str) -> bool:
         """Check if IP is in allowlist."""
+        if not self.allowlist_networks:
+            return False
+        # inet_pton parses the address in C; both versions then share the
+        # same integer range search
+        if ":" in ip:
+            family, version = socket.AF_INET6, 6
+        else:
+            family, version = socket.AF_INET, 4
         try:
-            ip_obj = ipaddress.ip_address(ip)
-            return any(ip_obj in net for net in self.allowlist_networks)
-        except ValueError:
+            ip_int = int.from_bytes(socket.inet_pton(family, ip), "big")
+        except OSError:
             return False
+        starts, ends = self._allowlist_ranges[version]
+        i = bisect_right(starts, ip_int) - 1
+        return i >= 0 and ip_int <= ends[i]
 
-    def _extract_packet_info(self, packet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract basic packet information from tshark output."""
+    def _extract_packet_info(self, layers: Dict[str, Any]) -> Optional[PacketInfo]:
+        """Extract basic packet information from a packet's tshark layers."""
         try:
-            timestamp = datetime.fromtimestamp(float(packet["_source"]["layers"]["frame"]["frame.time_epoch"]))
-            layers = packet.get("_source", {}).get("layers", {})
-            if not isinstance(layers, dict):
-                return None
-                
+            timestamp = float(layers["frame"]["frame.time_epoch"])
+
             # Extract IP layer
             ip_layer = layers.get("ip") or layers.get("ipv6")
             if not ip_layer:
@@ -144,129 +231,230 @@ class NetworkDetector:
                 
             src_ip = ip_layer.get("ip.src") or ip_layer.get("ipv6.src")
             dst_ip = ip_layer.get("ip.dst") or ip_layer.get("ipv6.dst")
+            # The same few addresses recur across a capture; interning keeps one
+            # object per address and makes the allowlist cache lookups cheap
+            if src_ip:
+                src_ip = sys.intern(src_ip)
+            if dst_ip:
+                dst_ip = sys.intern(dst_ip)
             src_port = int(tcp_layer.get("tcp.srcport", 0))
             dst_port = int(tcp_layer.get("tcp.dstport", 0))
             
             if not all([src_ip, dst_ip, src_port, dst_port]):
                 return None
                 
-            return {
-                "timestamp": timestamp,
-                "src_ip": src_ip,
-                "dst_ip": dst_ip,
-                "src_port": src_port,
-                "dst_port": dst_port,
-                "layers": layers
-            }
+            return PacketInfo(timestamp, src_ip, dst_ip, src_port, dst_port, layers)
             
         except (KeyError, ValueError, TypeError) as e:
-            logger.debug(f"Error extracting packet info: {e}")
+            logger.debug("Error extracting packet info: %s", e)
             return None
 
+    @staticmethod
+    def _iter_packet_batches(
+        fd: int, chunk_size: int = 64 * 1024
+    ) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Yield batches of packets from tshark's JSON output as they arrive.
+
+        tshark -T json prints a single pretty-printed array in which every
+        packet object opens on a "  {" line and closes on a "  }" line; nested
+        lines are indented deeper, so those two markers are unambiguous. The
+        pipe is drained in large chunks and each packet is sliced out of the
+        buffer and decoded on its own with orjson, so we never wait for the
+        array to close. Every packet completed by a read is yielded in one
+        batch.
+        """
+        buf = bytearray()
+        while True:
+            chunk = os.read(fd, chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+            batch = []
+            pos = 0
+            while True:
+                begin = buf.find(b"\n  {", pos)
+                if begin < 0:
+                    # Keep enough of the tail to complete a split marker
+                    pos = max(pos, len(buf) - 4)
+                    break
+                end = buf.find(b"\n  }", begin)
+                if end < 0:
+                    pos = begin
+                    break
+                pos = end + 4
+                try:
+                    batch.append(orjson.loads(buf[begin + 1:pos]))
+                except orjson.JSONDecodeError as e:
+                    logger.debug("JSON decode error on packet: %s", e)
+            del buf[:pos]
+            if batch:
+                yield batch
+
+    def _pin_tshark(self, pid: int):
+        """Pin the tshark process to detector.tshark_cpu, if set (Linux only)."""
+        tshark_cpu = self.config.get("detector.tshark_cpu")
+        if tshark_cpu is None or not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            os.sched_setaffinity(pid, {int(tshark_cpu)})
+        except OSError as e:
+            logger.warning("Could not pin tshark to CPU %s: %s", tshark_cpu, e)
+
+    def _pin_capture_thread(self):
+        """
+        Pin the capture loop to detector.capture_cpu and apply
+        detector.capture_priority, if configured (Linux only).
+
+        Keeping the packet loop on one core, next to tshark's, avoids cache
+        thrash from migrations at high packet rates.
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            return
+        capture_cpu = self.config.get("detector.capture_cpu")
+        if capture_cpu is not None:
+            try:
+                os.sched_setaffinity(0, {int(capture_cpu)})
+                logger.info("Capture loop pinned to CPU %s", capture_cpu)
+            except OSError as e:
+                logger.warning("Could not pin capture loop to CPU %s: %s", capture_cpu, e)
+        priority = self.config.get("detector.capture_priority")
+        if priority is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, int(priority))
+            except OSError as e:
+                logger.warning("Could not set capture priority %s: %s", priority, e)
+
     def start_capture(self) -> Generator[Event, None, None]:
         """Start packet capture and yield security events."""
-        logger.info(f"Starting packet capture with command: {' '.join(self.tshark_cmd)}")
+        logger.info("Starting packet capture with command: %s", ' '.join(self.tshark_cmd))
         
         try:
             process = subprocess.Popen(
                 self.tshark_cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
+                bufsize=0,
             )
             
-            logger.info(f"Tshark process started with PID: {process.pid}")
+            self._capture_process = process
+            logger.info("Tshark process started with PID: %s", process.pid)
+            # Pinned from here rather than with preexec_fn, which isn't safe
+            # to use once the process has threads running
+            self._pin_tshark(process.pid)
+            # Pin after the fork so tshark doesn't inherit the capture core
+            self._pin_capture_thread()
             
-            # Process output line by line
-            for line in process.stdout:
-                try:
-                    # tshark can sometimes output multiple JSON objects on one line
-                    for jsonObj in json.loads(f'[{line.strip().replace("}{", "},{")}]'):
-                        event = self._process_packet(jsonObj)
-                        if event:
-                            yield event
-                            
-                except json.JSONDecodeError as e:
-                    logger.debug(f"JSON decode error on line: {line.strip()} - {e}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing packet: {e}")
-                    continue
+            # Process output a read's worth of packets at a time
+            for batch in self._iter_packet_batches(process.stdout.fileno()):
+                yield from self._process_batch(batch)
                     
         except Exception as e:
-            logger.error(f"Error starting packet capture: {e}")
+            logger.error("Error starting packet capture: %s", e)
             raise
         finally:
+            self._capture_process = None
             if 'process' in locals() and process.poll() is None:
                 process.terminate()
                 logger.info("Tshark process terminated")
 
+    def stop_capture(self) -> bool:
+        """
+        Stop a running capture from outside the capture loop, e.g. a signal handler.
+
+        Terminating tshark closes its pipe, so the capture generator ends at
+        its next read instead of waiting for another packet. Returns whether
+        a capture was running.
+        """
+        process = self._capture_process
+        if process is None or process.poll() is not None:
+            return False
+        process.terminate()
+        return True
+
+    def _process_batch(self, packets: List[Dict[str, Any]]) -> List[Event]:
+        """Process a batch of packets and return the security events found."""
+        process_packet = self._process_packet
+        events = []
+        for packet in packets:
+            try:
+                event = process_packet(packet)
+                if event:
+                    events.append(event)
+            except Exception as e:
+                logger.error("Error processing packet: %s", e)
+        return events
+
     def _process_packet(self, packet: Dict[str, Any]) -> Optional[Event]:
         """Process a single packet and return security event if found."""
-        packet_info = self._extract_packet_info(packet)
+        layers = packet.get("_source", {}).get("layers", {})
+        if not isinstance(layers, dict):
+            return None
+
+        # Cheap reject before any address parsing: no enabled rule reads this packet
+        if self._rule_layers.isdisjoint(layers):
+            return None
+
+        packet_info = self._extract_packet_info(layers)
         if not packet_info:
             return None
             
         # Check if destination is allowlisted
-        if self._is_allowlisted(packet_info["dst_ip"]):
+        if self._is_allowlisted(packet_info.dst_ip):
             return None
-            
-        layers = packet_info["layers"]
         
-        # Process protocols based on configuration
-        event: Optional[Event] = None
+        # Only the enabled protocols' layers are registered, in rule order
+        for layer_name, handler in self._handlers:
+            layer = layers.get(layer_name)
+            if layer is not None:
+                event = handler(layer, packet_info)
+                if event:
+                    return event
 
-        # HTTP
-        if self.config.is_protocol_enabled("http") and "http" in layers:
-            event = http_rules.process_http_packet(
-                layers["http"], packet_info, self.credential_keys, self.max_body_size
-            )
-            if event: return event
-
-        # SMTP
-        if self.config.is_protocol_enabled("smtp") and "smtp" in layers:
-            event = smtp_rules.process_smtp_packet(layers["smtp"], packet_info)
-            if event: return event
-
-        # POP3/IMAP
-        if self.config.is_protocol_enabled("imap_pop3"):
-            pop3_layer = layers.get("pop") or layers.get("pop3")
-            imap_layer = layers.get("imap")
-            if pop3_layer or imap_layer:
-                event = pop3_imap_rules.process_pop3_imap_packet(pop3_layer, imap_layer, packet_info)
-                if event: return event
-
-        # FTP
-        if self.config.is_protocol_enabled("ftp") and "ftp" in layers:
-            event = ftp_rules.process_ftp_packet(layers["ftp"], packet_info)
-            if event: return event
-
-        # TELNET
-        if self.config.is_protocol_enabled("telnet") and "telnet" in layers:
-            event = telnet_rules.process_telnet_packet(layers["telnet"], packet_info)
-            if event: return event
-
-        # TLS
-        if self.config.is_protocol_enabled("tls") and "tls" in layers:
-            tls_config = self.config.get("detector.protocols.tls", {})
-            min_version = tls_config.get("min_version", "1.2")
-            require_sni = tls_config.get("require_sni", False)
-            event = tls_rules.process_tls_packet(layers["tls"], packet_info, min_version, require_sni)
-            if event: return event
-
-        # SMB
-        if self.config.is_protocol_enabled("smb") and "smb" in layers:
-            smb_config = self.config.get("detector.protocols.smb", {})
-            detect_plaintext_auth = smb_config.get("detect_plaintext_auth", True)
-            event = smb_rules.process_smb_packet(layers["smb"], packet_info, detect_plaintext_auth)
-            if event: return event
-
-        # DNS
-        if self.config.is_protocol_enabled("dns") and "dns" in layers:
-            dns_config = self.config.get("detector.protocols.dns", {})
-            detect_tunneling = dns_config.get("detect_tunneling", True)
-            event = dns_rules.process_dns_packet(layers["dns"], packet_info, detect_tunneling)
-            if event: return event
-                
         return None
+
+    def _build_handlers(self) -> List[Tuple[str, Callable[[Any, PacketInfo], Optional[Event]]]]:
+        """List (JSON layer, rule handler) pairs for the enabled protocols."""
+        handlers = {
+            "http": self._handle_http,
+            "smtp": smtp_rules.process_smtp_packet,
+            "pop": self._handle_pop3,
+            "imap": self._handle_imap,
+            "ftp": ftp_rules.process_ftp_packet,
+            "telnet": telnet_rules.process_telnet_packet,
+            "tls": self._handle_tls,
+            "smb": self._handle_smb,
+            "dns": self._handle_dns,
+        }
+        return [
+            (layer_name, handlers[layer_name])
+            for protocol, (_, layer_names) in self._PROTOCOL_FILTERS.items()
+            if self._proto_enabled[protocol]
+            for layer_name in layer_names
+        ]
+
+    def _handle_http(self, http_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return http_rules.process_http_packet(
+            http_layer, packet_info, self.credential_matcher, self.max_body_size
+        )
+
+    def _handle_pop3(self, pop3_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return pop3_imap_rules.process_pop3_imap_packet(pop3_layer, None, packet_info)
+
+    def _handle_imap(self, imap_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return pop3_imap_rules.process_pop3_imap_packet(None, imap_layer, packet_info)
+
+    def _handle_tls(self, tls_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return tls_rules.process_tls_packet(
+            tls_layer, packet_info, self._tls_min_version_code, self._tls_require_sni
+        )
+
+    def _handle_smb(self, smb_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return smb_rules.process_smb_packet(
+            smb_layer, packet_info, self._smb_detect_plaintext_auth
+        )
+
+    def _handle_dns(self, dns_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
+        return dns_rules.process_dns_packet(
+            dns_layer, packet_info, self._dns_detect_tunneling
+        )
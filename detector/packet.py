@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple
+
+
+class PacketInfo(NamedTuple):
+    """Addressing and dissected layers of a captured packet, as passed to the rules."""
+
+    timestamp: float  # epoch seconds, as reported by tshark
+    src_ip: str
+    dst_ip: str
+    src_port: int
+    dst_port: int
+    layers: Dict[str, Any]
+
+    def event_time(self) -> datetime:
+        """The capture time as a UTC datetime, built only for packets that raise an event."""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
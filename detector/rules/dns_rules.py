@@ -7,59 +7,84 @@ Detects DNS tunneling, suspicious queries, and data exfiltration attempts.
 import logging
 import re
 from typing import Dict, Any, Optional
-from datetime import datetime
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Base64-alphabet bytes map to 1 and everything else to 0, so a run of N
+# Base64 characters becomes N consecutive 1 bytes found by a plain substring
+# search. Hex digits are a subset of the alphabet, so the same runs cover
+# hex-encoded data. Non-ASCII characters encode to bytes >= 0x80 and break runs.
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_BASE64_TABLE = bytes(1 if i in _BASE64_ALPHABET else 0 for i in range(256))
+_BASE64_RUN_TUNNELING = b"\x01" * 20
+_BASE64_RUN_ENCODED_DATA = b"\x01" * 16
+
+# Suspicious subdomain patterns, compiled once into a single alternation
+_SUSPICIOUS_SUBDOMAIN_RE = re.compile(
+    "|".join((
+        r'[a-z0-9]{20,}\.',  # Long random subdomains
+        r'[A-Za-z0-9+/]{10,}\.',  # Base64-like subdomains
+        r'tunnel\.',  # Explicit tunneling indicators
+        r'exfil\.',  # Exfiltration indicators
+    )),
+    re.IGNORECASE,
+)
+_MIN_SUSPICIOUS_SUBDOMAIN_LEN = len("exfil.")
+
+
+def _base64_class_map(query_name: str) -> bytes:
+    """Mark each byte of the query name as in (1) or out of (0) the Base64 alphabet."""
+    return query_name.encode("utf-8", "surrogatepass").translate(_BASE64_TABLE)
+
+
+_SUSPICIOUS_DOMAINS = KeywordMatcher([
+    "malware", "virus", "trojan", "backdoor", "keylogger",
+    "botnet", "c2", "command", "control", "exfil",
+    "tunnel", "bypass", "proxy", "anonymizer"
+], ignore_case=True)
+
+# These can be used for data exfiltration
+_UNUSUAL_QUERY_TYPES = frozenset(["TXT", "CNAME", "MX"])
+
+# Free TLDs often used for malicious purposes
+_SUSPICIOUS_TLDS = (".tk", ".ml", ".ga", ".cf")
+
 
 def detect_dns_tunneling(dns_layer: Dict[str, Any]) -> bool:
     """Detect potential DNS tunneling attempts."""
     # Check for unusually long domain names (common in DNS tunneling)
     query_name = dns_layer.get("dns.qry.name", "")
+    name_length = len(query_name)
     
-    if len(query_name) > 50:  # Normal DNS names are typically much shorter
+    if name_length > 50:  # Normal DNS names are typically much shorter
         return True
     
-    # Check for base64-like patterns in domain names
-    base64_pattern = r'[A-Za-z0-9+/]{20,}={0,2}'
-    if re.search(base64_pattern, query_name):
+    # Check for base64-like patterns in domain names; most names are too
+    # short to hold a run, which skips the encode and translate
+    if name_length >= len(_BASE64_RUN_TUNNELING) and _BASE64_RUN_TUNNELING in _base64_class_map(query_name):
         return True
     
-    # Check for suspicious subdomain patterns
-    suspicious_patterns = [
-        r'[a-z0-9]{20,}\.',  # Long random subdomains
-        r'[A-Za-z0-9+/]{10,}\.',  # Base64-like subdomains
-        r'tunnel\.',  # Explicit tunneling indicators
-        r'exfil\.',  # Exfiltration indicators
-    ]
-    
-    for pattern in suspicious_patterns:
-        if re.search(pattern, query_name, re.IGNORECASE):
-            return True
+    # Check for suspicious subdomain patterns; the shortest, "exfil.", is 6 characters
+    if name_length >= _MIN_SUSPICIOUS_SUBDOMAIN_LEN and _SUSPICIOUS_SUBDOMAIN_RE.search(query_name):
+        return True
     
     return False
 
 
 def detect_suspicious_dns_queries(dns_layer: Dict[str, Any]) -> bool:
     """Detect suspicious DNS query patterns."""
-    query_name = dns_layer.get("dns.qry.name", "").lower()
+    query_name = dns_layer.get("dns.qry.name", "")
     query_type = dns_layer.get("dns.qry.type", "")
     
     # Check for suspicious domain patterns
-    suspicious_domains = [
-        "malware", "virus", "trojan", "backdoor", "keylogger",
-        "botnet", "c2", "command", "control", "exfil",
-        "tunnel", "bypass", "proxy", "anonymizer"
-    ]
-    
-    for domain in suspicious_domains:
-        if domain in query_name:
-            return True
+    if _SUSPICIOUS_DOMAINS.contains_any(query_name):
+        return True
     
     # Check for unusual query types
-    unusual_types = ["TXT", "CNAME", "MX"]  # These can be used for data exfiltration
-    if query_type in unusual_types and len(query_name) > 30:
+    if query_type in _UNUSUAL_QUERY_TYPES and len(query_name) > 30:
         return True
     
     # Check for domains with many subdomains (potential tunneling)
@@ -74,94 +99,51 @@ def detect_dns_data_exfiltration(dns_layer: Dict[str, Any]) -> bool:
     """Detect potential data exfiltration via DNS."""
     query_name = dns_layer.get("dns.qry.name", "")
     
-    # Check for encoded data patterns
-    # Base64 encoding (common in DNS tunneling)
-    if re.search(r'[A-Za-z0-9+/]{16,}={0,2}', query_name):
-        return True
-    
-    # Hex encoding
-    if re.search(r'[0-9a-fA-F]{16,}', query_name):
+    # Check for encoded data patterns (Base64, or hex which is a subset of it),
+    # skipping names too short to hold a run
+    if (
+        len(query_name) >= len(_BASE64_RUN_ENCODED_DATA)
+        and _BASE64_RUN_ENCODED_DATA in _base64_class_map(query_name)
+    ):
         return True
     
     # Check for suspicious TLDs used in tunneling
-    suspicious_tlds = [".tk", ".ml", ".ga", ".cf"]  # Free TLDs often used for malicious purposes
-    for tld in suspicious_tlds:
-        if query_name.endswith(tld):
-            return True
+    if query_name.endswith(_SUSPICIOUS_TLDS):
+        return True
     
     return False
 
 
 def process_dns_packet(
     dns_layer: Dict[str, Any], 
-    packet_info: Dict[str, Any],
+    packet_info: PacketInfo,
     detect_tunneling: bool = True
 ) -> Optional[Event]:
     """Process DNS packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
     query_name = dns_layer.get("dns.qry.name", "")
     query_type = dns_layer.get("dns.qry.type", "")
     
     # Check for DNS tunneling
     if detect_tunneling and detect_dns_tunneling(dns_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="HIGH",
-            rule="dns.tunneling",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "DNS",
-                "description": "Potential DNS tunneling detected",
-                "query_name": query_name,
-                "query_type": query_type,
-                "query_length": len(query_name)
-            },
-            tags=["dns", "tunneling", "exfiltration"]
+        return Event.create_dns_tunneling(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, query_name, query_type
         )
     
     # Check for suspicious queries
     if detect_suspicious_dns_queries(dns_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="MED",
-            rule="dns.suspicious_query",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "DNS",
-                "description": "Suspicious DNS query detected",
-                "query_name": query_name,
-                "query_type": query_type
-            },
-            tags=["dns", "suspicious", "malware"]
+        return Event.create_dns_suspicious_query(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, query_name, query_type
         )
     
     # Check for data exfiltration
     if detect_dns_data_exfiltration(dns_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="HIGH",
-            rule="dns.data_exfiltration",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "DNS",
-                "description": "Potential data exfiltration via DNS",
-                "query_name": query_name,
-                "query_type": query_type
-            },
-            tags=["dns", "exfiltration", "data_leak"]
+        return Event.create_dns_data_exfiltration(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, query_name, query_type
         )
     
     return None
@@ -1,17 +1,20 @@
 from typing import Dict, Any, Optional
 
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher, layer_strings
 
+_FTP_KEYWORDS = KeywordMatcher(["USER ", "PASS "], ignore_case=True)
 
-def process_ftp_packet(ftp_layer: Dict[str, Any], packet_info: Dict[str, Any]) -> Optional[Event]:
+
+def process_ftp_packet(ftp_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
     """Process FTP packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
-    content = "\n".join(str(v) for v in ftp_layer.values() if isinstance(v, str)).upper()
-    if "USER " in content or "PASS " in content:
+    if _FTP_KEYWORDS.contains_any_in(layer_strings(ftp_layer)):
         return Event.create_ftp_clear_creds(
             src_ip=src_ip,
             src_port=src_port,
@@ -1,83 +1,140 @@
-from typing import Dict, Any, List, Optional
+import re
+import sys
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Set
 
 from ..event_model import Event
+from ..packet import PacketInfo
 
 
-def parse_headers(fields: List[Dict[str, Any]]) -> Dict[str, str]:
-    """Parse HTTP headers from tshark fields."""
-    headers = {}
+class CredentialMatcher:
+    """
+    Finds credential keys in HTTP bodies, built once per credential-key set.
+
+    Form fields and quoted JSON keys are found in a single pass. A form field
+    is the text between "&" separators; it counts when its name, ignoring
+    surrounding whitespace and compared lower-cased, is a key and its value is
+    not blank. The quoted JSON form of a key is compared exactly.
+    """
+
+    def __init__(self, credential_keys: Iterable[str]):
+        self.credential_keys = frozenset(credential_keys)
+        self._pattern = self._compile(self.credential_keys)
+
+    @staticmethod
+    def _compile(credential_keys: FrozenSet[str]) -> Optional[re.Pattern]:
+        if not credential_keys:
+            return None
+        form_names = sorted((key for key in credential_keys if key == key.lower()), key=len, reverse=True)
+        if form_names:
+            form = r"(?:\A|&)\s*(?i:(" + "|".join(re.escape(name) for name in form_names) + r"))\s*=[^&]*[^&\s]"
+        else:
+            form = r"(?!)()"  # keep the group numbering
+        json_names = sorted(credential_keys, key=len, reverse=True)
+        json = r'"(' + "|".join(re.escape(name) for name in json_names) + r')"'
+        # A lookahead lets matches overlap, e.g. JSON keys sharing a quote
+        return re.compile(f"(?={form}|{json})")
+
+    def scan(self, body: str) -> Set[str]:
+        """Return the credential keys found in ``body``."""
+        if self._pattern is None:
+            return set()
+        return {
+            form_key.lower() if form_key else json_key
+            for form_key, json_key in self._pattern.findall(body)
+        }
+
+
+# The only request headers the rules read, matched anywhere in the header block
+_HEADER_RE = re.compile(
+    r"^(Host|Authorization|User-Agent|Content-Type):[ \t]*([^\r\n]+)", re.M | re.I | re.ASCII
+)
+# Canonical spelling of each matched name, looked up instead of re-casing it
+_CANONICAL_HEADERS = {
+    name.lower(): name for name in ("Host", "Authorization", "User-Agent", "Content-Type")
+}
+
+
+# Header fields that tshark may show as a bare value, keyed by the last
+# component of the field name
+_DIRECT_HEADER_FIELDS = {
+    "host": "Host",
+    "authorization": "Authorization",
+    "user_agent": "User-Agent",
+    "content_type": "Content-Type",
+}
+
+
+def header_block(fields: List[Dict[str, Any]]) -> str:
+    """Join the displayed header lines from tshark's HTTP header fields into one block."""
+    lines = []
     for field in fields:
         if not isinstance(field, dict):
             continue
-            
+        # Only header fields; other fields' text must not be read as headers
         name = field.get("name", "")
         if not name.lower().startswith("http/"):
             continue
-            
         show = field.get("show", "")
         if not show:
             continue
-            
-        # Handle different header formats
         if ":" in show:
-            # Format: 'Host: example.com'
-            parts = show.split(":", 1)
-            if len(parts) == 2:
-                headers[parts[0].strip()] = parts[1].strip()
+            lines.append(show)
         else:
-            # Direct field like http.host
-            field_name = name.split(".")[-1]
-            if field_name in ("host", "authorization", "user_agent", "content_type"):
-                headers[field_name.replace("_", "-").title()] = show
-                
-    return headers
+            header = _DIRECT_HEADER_FIELDS.get(name.rsplit(".", 1)[-1])
+            if header:
+                lines.append(f"{header}: {show}")
+    return "\n".join(lines)
+
+
+def parse_headers(block: str) -> Dict[str, str]:
+    """Parse the HTTP headers the rules use out of a header block."""
+    canonical = _CANONICAL_HEADERS
+    return {
+        canonical[m.group(1).lower()]: m.group(2).strip()
+        for m in _HEADER_RE.finditer(block)
+    }
 
 
 def detect_http_basic_auth(headers: Dict[str, str]) -> bool:
     """Detect HTTP Basic Authentication."""
-    auth_header = headers.get("Authorization") or headers.get("authorization")
-    return isinstance(auth_header, str) and auth_header.startswith("Basic ")
+    auth_header = headers.get("Authorization")
+    # The auth scheme is case-insensitive; a 6-char slice is all that gets lowered
+    return auth_header is not None and auth_header[:6].lower() == "basic "
 
-def scan_body_for_credentials(body: str, credential_keys: set) -> List[str]:
-    """Scan HTTP body for credential keys."""
-    found_keys = []
-    
-    # Form-style key=value scanning
-    for part in body.split("&"):
-        if "=" in part:
-            key, value = part.split("=", 1)
-            key = key.lower().strip()
-            if key in credential_keys and value.strip():
-                found_keys.append(key)
-                
-    # JSON-like key scanning
-    for key in credential_keys:
-        token = f'"{key}"'
-        if token in body:
-            found_keys.append(key)
-            
-    return list(set(found_keys)) # Return unique keys
+def _fits_utf8_size(text: str, limit: int) -> bool:
+    """Whether ``text`` encodes to at most ``limit`` UTF-8 bytes."""
+    # Each character takes 1 to 4 bytes, so only the in-between case needs
+    # encoding; isascii() reads a flag on the str object rather than scanning
+    n = len(text)
+    if n > limit:
+        return False
+    if n * 4 <= limit or text.isascii():
+        return True
+    return len(text.encode("utf-8")) <= limit
 
 
 def process_http_packet(
     http_layer: Dict[str, Any], 
-    packet_info: Dict[str, Any],
-    credential_keys: set,
+    packet_info: PacketInfo,
+    credential_matcher: CredentialMatcher,
     max_body_size: int
 ) -> Optional[Event]:
     """Process HTTP packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
     # Parse headers
     fields = http_layer.get("http", [])
     if not isinstance(fields, list):
         return None
         
-    headers = parse_headers(fields)
+    headers = parse_headers(header_block(fields))
     host = headers.get("Host")
+    if host:
+        # Hosts repeat for the life of a connection
+        host = sys.intern(host)
     
     # Check for Basic Auth
     if detect_http_basic_auth(headers):
@@ -98,8 +155,8 @@ def process_http_packet(
         else:
             body = str(file_data)
             
-    if body and len(body.encode("utf-8")) <= max_body_size:
-        found_keys = scan_body_for_credentials(body, credential_keys)
+    if body and _fits_utf8_size(body, max_body_size):
+        found_keys = credential_matcher.scan(body)
         if found_keys:
             return Event.create_http_credential_key(
                 src_ip=src_ip,
@@ -0,0 +1,151 @@
+"""
+Multi-keyword matching shared by the rule modules.
+
+Rules typically ask "which of these few literals occur in this payload?".
+Compiling the literals into a single alternation lets the regex engine find
+all of them in one C-level pass over the text, instead of one ``in`` scan
+per keyword. Where the optional ``hyperscan`` package is installed, ASCII
+keyword sets are compiled into a Hyperscan literal database instead, which
+scans long payloads far faster than a case-insensitive ``re`` alternation.
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, Set
+
+try:
+    import hyperscan
+except ImportError:  # No Windows builds; the re backend covers every platform
+    hyperscan = None
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of literal keywords occur in a text.
+
+    With ``ignore_case`` the text is matched case-insensitively in place,
+    rather than building an upper/lower-cased copy of every payload. Keywords
+    that are plain ASCII are folded with ASCII rules only, which skips the
+    Unicode case tables.
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        self.keywords = frozenset(keywords)
+        self.ignore_case = ignore_case
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        flags = 0
+        if ignore_case:
+            flags = re.IGNORECASE
+            if all(k.isascii() for k in self.keywords):
+                flags |= re.ASCII
+        alternation = "|".join(re.escape(k) for k in ordered)
+        # The lookahead lets matches overlap, so one keyword can't hide another
+        self._pattern = re.compile("(?=(" + alternation + "))", flags) if ordered else None
+        # Presence checks need no overlap; a plain alternation lets the regex
+        # engine skip ahead on the keywords' literal prefixes
+        self._any_pattern = re.compile(alternation, flags) if ordered else None
+        self._hs_keywords = tuple(ordered)
+        self._hs_db = (
+            self._compile_hyperscan(self._hs_keywords, ignore_case)
+            if hyperscan is not None and ordered and all(k.isascii() for k in ordered)
+            else None
+        )
+        # Only the longest keyword is reported at a position, so also credit
+        # the keywords contained in it
+        self._implied = {
+            self._fold(k): frozenset(
+                other for other in self.keywords if self._fold(other) in self._fold(k)
+            )
+            for k in self.keywords
+        }
+
+    @staticmethod
+    def _compile_hyperscan(keywords, ignore_case: bool):
+        flags = hyperscan.HS_FLAG_SINGLEMATCH
+        if ignore_case:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[k.encode("ascii") for k in keywords],
+            ids=list(range(len(keywords))),
+            flags=flags,
+            literal=True,
+        )
+        return db
+
+    def _fold(self, text: str) -> str:
+        return text.casefold() if self.ignore_case else text
+
+    def _hs_contains(self, text: str) -> bool:
+        try:
+            self._hs_db.scan(
+                text.encode("utf-8", "surrogatepass"), match_event_handler=_stop_scan
+            )
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+    def contains_any(self, text: str) -> bool:
+        """Return whether any keyword occurs in ``text``, stopping at the first."""
+        if self._hs_db is not None:
+            return self._hs_contains(text)
+        return self._any_pattern is not None and self._any_pattern.search(text) is not None
+
+    def contains_any_in(self, texts: Iterable[str]) -> bool:
+        """Return whether any keyword occurs in any of ``texts``, stopping at the first."""
+        if self._hs_db is not None:
+            return any(self._hs_contains(text) for text in texts)
+        if self._any_pattern is None:
+            return False
+        search = self._any_pattern.search
+        return any(search(text) is not None for text in texts)
+
+    def find_in(self, texts: Iterable[str]) -> FrozenSet[str]:
+        """Return the keywords present across ``texts``, stopping once all are found."""
+        found: FrozenSet[str] = frozenset()
+        for text in texts:
+            found |= self.find(text)
+            if found == self.keywords:
+                break
+        return found
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the keywords present in ``text``."""
+        if self._hs_db is not None:
+            ids: Set[int] = set()
+            self._hs_db.scan(
+                text.encode("utf-8", "surrogatepass"),
+                match_event_handler=_collect_match,
+                context=ids,
+            )
+            keywords = self._hs_keywords
+            return frozenset(keywords[i] for i in ids)
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        for match in set(self._pattern.findall(text)):
+            found |= self._implied.get(self._fold(match), frozenset())
+        return frozenset(found)
+
+
+def _stop_scan(id_: int, start: int, end: int, flags: int, context: Any) -> bool:
+    return True
+
+
+def _collect_match(id_: int, start: int, end: int, flags: int, ids: Set[int]) -> None:
+    ids.add(id_)
+
+
+def layer_strings(layer: Dict[str, Any], include_lists: bool = False) -> Iterator[str]:
+    """
+    Yield the string fields of a tshark protocol layer, one at a time.
+
+    Matching field by field lets a rule stop at the first hit without ever
+    building a joined copy of the layer.
+    """
+    for value in layer.values():
+        if isinstance(value, str):
+            yield value
+        elif include_lists and isinstance(value, list):
+            for item in value:
+                if isinstance(item, str):
+                    yield item
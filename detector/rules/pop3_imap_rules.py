@@ -1,23 +1,28 @@
 from typing import Dict, Any, Optional
 
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher, layer_strings
+
+_POP3_KEYWORDS = KeywordMatcher(["USER ", "PASS ", "STLS"], ignore_case=True)
+_IMAP_KEYWORDS = KeywordMatcher([" LOGIN ", "STARTTLS"], ignore_case=True)
 
 
 def process_pop3_imap_packet(
     pop3_layer: Optional[Dict[str, Any]], 
     imap_layer: Optional[Dict[str, Any]], 
-    packet_info: Dict[str, Any]
+    packet_info: PacketInfo
 ) -> Optional[Event]:
     """Process POP3/IMAP packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
     # Process POP3
     if pop3_layer:
-        content = "\n".join(str(v) for v in pop3_layer.values() if isinstance(v, str)).upper()
-        if ("USER " in content or "PASS " in content) and "STLS" not in content:
+        found = _POP3_KEYWORDS.find_in(layer_strings(pop3_layer))
+        if ("USER " in found or "PASS " in found) and "STLS" not in found:
             return Event.create_pop3_clear_creds(
                 src_ip=src_ip,
                 src_port=src_port,
@@ -27,8 +32,8 @@ def process_pop3_imap_packet(
             
     # Process IMAP
     if imap_layer:
-        content = "\n".join(str(v) for v in imap_layer.values() if isinstance(v, str)).upper()
-        if " LOGIN " in content and "STARTTLS" not in content:
+        found = _IMAP_KEYWORDS.find_in(layer_strings(imap_layer))
+        if " LOGIN " in found and "STARTTLS" not in found:
             return Event.create_imap_clear_login(
                 src_ip=src_ip,
                 src_port=src_port,
@@ -5,149 +5,129 @@ Detects plaintext authentication, weak encryption, and suspicious SMB activity.
 """
 
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
 
-def detect_smb_plaintext_auth(smb_layer: Dict[str, Any]) -> bool:
-    """Detect if SMB authentication is in plaintext."""
-    # Check for NTLM authentication without encryption
+# SMB command 0x73 is Session Setup AndX
+_SMB_SESSION_SETUP_ANDX = 0x73
+_SMB_FLAGS_RESPONSE = 0x80
+_SMB_FLAGS2_SECURITY_SIGNATURE_REQUIRED = 0x0004  # Bit 2
+
+# Potentially suspicious commands
+_SUSPICIOUS_COMMANDS = frozenset({
+    0x2e,  # Read AndX
+    0x2f,  # Write AndX
+    0x0a,  # Open AndX
+    0x0c,  # Close
+})
+
+_NTLM_INDICATORS = KeywordMatcher(["NTLM", "NEGOTIATE"], ignore_case=True)
+
+_SENSITIVE_PATTERNS = KeywordMatcher([
+    "passwd", "shadow", "config", "secret", "key", "credential",
+    "admin", "root", "system", "backup", "dump"
+], ignore_case=True)
+
+
+def _parse_hex(value: Any) -> Optional[int]:
+    """Parse a tshark hex field such as "0x73"; None if missing or malformed."""
+    if value is None:
+        return None
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_smb_header(smb_layer: Dict[str, Any]) -> Tuple[Optional[int], int, Optional[int]]:
+    """
+    Parse the SMB header's command, flags and flags2 hex strings to ints, once per packet.
+
+    A malformed field only disables the checks that read it: the command
+    becomes None, flags 0 (not a response) and flags2 None.
+    """
     smb_header = smb_layer.get("SMB Header", {})
-    smb_cmd = smb_header.get("smb.cmd")
-    
-    # SMB command 0x73 is Session Setup AndX
-    if smb_cmd == "0x73":
-        # Check if it's a response (bit 0 set means response)
-        smb_flags = smb_header.get("smb.flags", "0x00")
-        is_response = int(smb_flags, 16) & 0x80
-        
-        if is_response:
-            # Check for NTLM authentication
-            smb_data = smb_layer.get("smb.data", "")
-            if isinstance(smb_data, list):
-                smb_data = " ".join(smb_data)
-            
-            # Look for NTLM indicators
-            if "NTLM" in str(smb_data).upper() or "NEGOTIATE" in str(smb_data).upper():
-                return True
-    
-    return False
+    smb_flags = _parse_hex(smb_header.get("smb.flags", "0x00"))
+    return (
+        _parse_hex(smb_header.get("smb.cmd")),
+        smb_flags if smb_flags is not None else 0,
+        _parse_hex(smb_header.get("smb.flags2", "0x0000")),
+    )
+
+
+def _smb_data(smb_layer: Dict[str, Any]) -> str:
+    smb_data = smb_layer.get("smb.data", "")
+    if isinstance(smb_data, list):
+        smb_data = " ".join(smb_data)
+    return str(smb_data)
 
 
-def detect_smb_weak_encryption(smb_layer: Dict[str, Any]) -> bool:
+def detect_smb_plaintext_auth(smb_cmd: Optional[int], smb_flags: int, smb_data: str) -> bool:
+    """Detect if SMB authentication is in plaintext."""
+    # Only Session Setup AndX responses carry the authentication exchange
+    if smb_cmd != _SMB_SESSION_SETUP_ANDX or not smb_flags & _SMB_FLAGS_RESPONSE:
+        return False
+    # Look for NTLM indicators
+    return _NTLM_INDICATORS.contains_any(smb_data)
+
+
+def detect_smb_weak_encryption(smb_flags2: int) -> bool:
     """Detect weak SMB encryption or lack of encryption."""
-    smb_header = smb_layer.get("SMB Header", {})
-    smb_flags2 = smb_header.get("smb.flags2", "0x0000")
-    
-    # Check if security signatures are disabled
-    flags2_value = int(smb_flags2, 16)
-    security_signature_required = flags2_value & 0x0004  # Bit 2
-    
     # If security signatures are not required, it's a potential security issue
-    if not security_signature_required:
-        return True
-    
-    return False
+    return not smb_flags2 & _SMB_FLAGS2_SECURITY_SIGNATURE_REQUIRED
 
 
-def detect_smb_suspicious_activity(smb_layer: Dict[str, Any]) -> bool:
+def detect_smb_suspicious_activity(smb_cmd: Optional[int], smb_data: str) -> bool:
     """Detect suspicious SMB activity patterns."""
-    smb_header = smb_layer.get("SMB Header", {})
-    smb_cmd = smb_header.get("smb.cmd")
-    
-    # Check for potentially suspicious commands
-    suspicious_commands = {
-        "0x2e",  # Read AndX
-        "0x2f",  # Write AndX
-        "0x0a",  # Open AndX
-        "0x0c",  # Close
-    }
-    
-    if smb_cmd in suspicious_commands:
-        # Check for access to sensitive files
-        smb_data = smb_layer.get("smb.data", "")
-        if isinstance(smb_data, list):
-            smb_data = " ".join(smb_data)
-        
-        sensitive_patterns = [
-            "passwd", "shadow", "config", "secret", "key", "credential",
-            "admin", "root", "system", "backup", "dump"
-        ]
-        
-        data_str = str(smb_data).lower()
-        for pattern in sensitive_patterns:
-            if pattern in data_str:
-                return True
-    
-    return False
+    if smb_cmd not in _SUSPICIOUS_COMMANDS:
+        return False
+    # Check for access to sensitive files
+    return _SENSITIVE_PATTERNS.contains_any(smb_data)
 
 
 def process_smb_packet(
     smb_layer: Dict[str, Any], 
-    packet_info: Dict[str, Any],
+    packet_info: PacketInfo,
     detect_plaintext_auth: bool = True
 ) -> Optional[Event]:
     """Process SMB packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
+    smb_cmd, smb_flags, smb_flags2 = _parse_smb_header(smb_layer)
+    # The payload is only inspected for the commands the checks care about
+    if smb_cmd == _SMB_SESSION_SETUP_ANDX or smb_cmd in _SUSPICIOUS_COMMANDS:
+        smb_data = _smb_data(smb_layer)
+    else:
+        smb_data = ""
+    
+    smb_cmd_str = smb_layer.get("SMB Header", {}).get("smb.cmd", "unknown")
+    if isinstance(smb_cmd_str, list):
+        # Repeated fields (e.g. AndX chains) arrive as a list
+        smb_cmd_str = ",".join(map(str, smb_cmd_str))
     
     # Check for plaintext authentication
-    if detect_plaintext_auth and detect_smb_plaintext_auth(smb_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="HIGH",
-            rule="smb.plaintext_auth",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "SMB",
-                "description": "Plaintext SMB authentication detected",
-                "smb_cmd": smb_layer.get("SMB Header", {}).get("smb.cmd", "unknown")
-            },
-            tags=["smb", "authentication", "plaintext"]
+    if detect_plaintext_auth and detect_smb_plaintext_auth(smb_cmd, smb_flags, smb_data):
+        return Event.create_smb_plaintext_auth(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, smb_cmd_str
         )
     
     # Check for weak encryption
-    if detect_smb_weak_encryption(smb_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="MED",
-            rule="smb.weak_encryption",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "SMB",
-                "description": "SMB without security signatures detected",
-                "smb_cmd": smb_layer.get("SMB Header", {}).get("smb.cmd", "unknown")
-            },
-            tags=["smb", "encryption", "security"]
+    if smb_flags2 is not None and detect_smb_weak_encryption(smb_flags2):
+        return Event.create_smb_weak_encryption(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, smb_cmd_str
         )
     
     # Check for suspicious activity
-    if detect_smb_suspicious_activity(smb_layer):
-        return Event(
-            ts=packet_info.get("timestamp"),
-            severity="MED",
-            rule="smb.suspicious_activity",
-            src_ip=src_ip,
-            src_port=src_port,
-            dst_ip=dst_ip,
-            dst_port=dst_port,
-            context={
-                "protocol": "SMB",
-                "description": "Suspicious SMB file access detected",
-                "smb_cmd": smb_layer.get("SMB Header", {}).get("smb.cmd", "unknown")
-            },
-            tags=["smb", "suspicious", "file_access"]
+    if detect_smb_suspicious_activity(smb_cmd, smb_data):
+        return Event.create_smb_suspicious_activity(
+            packet_info.event_time(), src_ip, src_port, dst_ip, dst_port, smb_cmd_str
         )
     
     return None
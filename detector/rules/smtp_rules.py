@@ -1,27 +1,24 @@
 from typing import Dict, Any, Optional
 
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher, layer_strings
 
+_SMTP_KEYWORDS = KeywordMatcher(["AUTH ", "STARTTLS"], ignore_case=True)
 
-def process_smtp_packet(smtp_layer: Dict[str, Any], packet_info: Dict[str, Any]) -> Optional[Event]:
+
+def process_smtp_packet(smtp_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
     """Process SMTP packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
-    # Collect SMTP content
-    content_lines = []
-    for key, value in smtp_layer.items():
-        if isinstance(value, list):
-            content_lines.extend(value)
-        elif isinstance(value, str):
-            content_lines.append(value)
-            
-    content = "\n".join(content_lines).upper()
+    # Scan SMTP content, including multi-line fields
+    found = _SMTP_KEYWORDS.find_in(layer_strings(smtp_layer, include_lists=True))
     
     # Check for AUTH before STARTTLS
-    if "AUTH " in content and "STARTTLS" not in content:
+    if "AUTH " in found and "STARTTLS" not in found:
         return Event.create_smtp_no_starttls(
             src_ip=src_ip,
             src_port=src_port,
@@ -1,17 +1,20 @@
 from typing import Dict, Any, Optional
 
 from ..event_model import Event
+from ..packet import PacketInfo
+from .matching import KeywordMatcher, layer_strings
 
+_TELNET_KEYWORDS = KeywordMatcher(["login:", "password:"], ignore_case=True)
 
-def process_telnet_packet(telnet_layer: Dict[str, Any], packet_info: Dict[str, Any]) -> Optional[Event]:
+
+def process_telnet_packet(telnet_layer: Dict[str, Any], packet_info: PacketInfo) -> Optional[Event]:
     """Process TELNET packet for security events."""
-    src_ip = packet_info.get("src_ip")
-    src_port = packet_info.get("src_port")
-    dst_ip = packet_info.get("dst_ip")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    src_port = packet_info.src_port
+    dst_ip = packet_info.dst_ip
+    dst_port = packet_info.dst_port
     
-    content = "\n".join(str(v) for v in telnet_layer.values() if isinstance(v, str)).lower()
-    if "login:" in content or "password:" in content:
+    if _TELNET_KEYWORDS.contains_any_in(layer_strings(telnet_layer)):
         return Event.create_telnet_clear_login(
             src_ip=src_ip,
             src_port=src_port,
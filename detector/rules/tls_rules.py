@@ -1,16 +1,70 @@
 from typing import Dict, Any, Optional, List
 
 from ..event_model import Event
+from ..packet import PacketInfo
 
+# Protocol version codes as they appear on the wire ("0x0303" for TLS 1.2)
+_TLS_VERSION_CODES = {
+    "1.0": 0x0301,
+    "1.1": 0x0302,
+    "1.2": 0x0303,
+    "1.3": 0x0304,
+}
+_TLS_VERSION_NAMES = {code: name for name, code in _TLS_VERSION_CODES.items()}
 
-def process_tls_packet(tls_layer: Dict[str, Any], packet_info: Dict[str, Any], min_version: str, require_sni: bool) -> Optional[Event]:
+
+def tls_version_code(version: Any) -> int:
+    """Map a configured TLS version such as "1.2" to its wire code, once at startup."""
+    try:
+        return _TLS_VERSION_CODES[str(version)]
+    except KeyError:
+        raise ValueError(f"Unsupported TLS min_version: {version}") from None
+
+
+def _tls_version_name(code: int) -> str:
+    return _TLS_VERSION_NAMES.get(code, f"0x{code:04x}")
+
+
+def _parse_version(value: Any) -> Optional[int]:
+    try:
+        # tshark format is "0x0303" for TLS 1.2
+        return int(value, 16)
+    except (ValueError, TypeError):
+        return None  # Ignore parsing errors
+
+
+def _offered_version(tls_layer: Dict[str, Any]) -> Optional[int]:
+    """
+    Return the highest TLS version a ClientHello offers.
+
+    TLS 1.3 clients keep the legacy version field at 0x0303 and list their
+    real versions in the supported_versions extension, so that wins when
+    present. GREASE placeholders (0x0a0a, 0x1a1a, ...) are skipped.
+    """
+    supported = tls_layer.get("tls.handshake.extensions.supported_version")
+    if supported:
+        if not isinstance(supported, list):
+            supported = [supported]
+        codes = [
+            code for code in map(_parse_version, supported)
+            if code is not None and code & 0x0F0F != 0x0A0A
+        ]
+        if codes:
+            return max(codes)
+    # Otherwise the ClientHello's own version field: the record layer of a
+    # ClientHello usually carries 0x0301 for compatibility
+    version_str = tls_layer.get("tls.handshake.version") or tls_layer.get("tls.record.version")
+    return _parse_version(version_str) if version_str else None
+
+
+def process_tls_packet(tls_layer: Dict[str, Any], packet_info: PacketInfo, min_version_code: int, require_sni: bool) -> Optional[Event]:
     """
     Process a TLS packet for security events, focusing on the ClientHello.
     """
-    src_ip = packet_info.get("src_ip")
-    dst_ip = packet_info.get("dst_ip")
-    src_port = packet_info.get("src_port")
-    dst_port = packet_info.get("dst_port")
+    src_ip = packet_info.src_ip
+    dst_ip = packet_info.dst_ip
+    src_port = packet_info.src_port
+    dst_port = packet_info.dst_port
 
     # We are interested in the ClientHello message
     handshake_type = tls_layer.get("tls.handshake.type")
@@ -18,36 +72,29 @@ def process_tls_packet(tls_layer: Dict[str, Any], packet_info: Dict[str, Any], m
         return None
 
     # Check TLS version
-    record_version_str = tls_layer.get("tls.record.version")
-    if record_version_str:
-        try:
-            # tshark format is "0x0303" for TLS 1.2
-            record_version = float(int(record_version_str, 16)) / 100.0 - 2.0
-            min_v_float = float(min_version)
-            if record_version < min_v_float:
-                return Event(
-                    ts=packet_info.get("timestamp"),
-                    severity="MED",
-                    rule="tls.weak_version",
-                    src_ip=src_ip,
-                    src_port=src_port,
-                    dst_ip=dst_ip,
-                    dst_port=dst_port,
-                    context={
-                        "protocol": "TLS",
-                        "version_detected": f"{record_version:.1f}",
-                        "minimum_required": min_version
-                    }
-                )
-        except (ValueError, TypeError):
-            pass # Ignore parsing errors
+    version_code = _offered_version(tls_layer)
+    if version_code is not None and version_code < min_version_code:
+        return Event(
+            ts=packet_info.event_time(),
+            severity="MED",
+            rule="tls.weak_version",
+            src_ip=src_ip,
+            src_port=src_port,
+            dst_ip=dst_ip,
+            dst_port=dst_port,
+            context={
+                "protocol": "TLS",
+                "version_detected": _tls_version_name(version_code),
+                "minimum_required": _tls_version_name(min_version_code)
+            }
+        )
 
     # Check for Server Name Indication (SNI)
     if require_sni:
         sni = tls_layer.get("tls.handshake.extensions_server_name")
         if not sni:
             return Event(
-                ts=packet_info.get("timestamp"),
+                ts=packet_info.event_time(),
                 severity="LOW",
                 rule="tls.missing_sni",
                 src_ip=src_ip,
@@ -1,14 +1,53 @@
 import os
+import queue
+import signal
 import time
 import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import IO, Optional
-import json
+from typing import IO, Any, Callable, List, Optional
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Vectored writes are POSIX only; elsewhere a batch is joined into one buffer
+_HAS_WRITEV = hasattr(os, "writev")
+_IOV_MAX = 1024  # Lowest common limit on buffers per writev() call
+
+# Writes are buffered and flushed at most this many seconds later, so tailing
+# readers still see events promptly without a flush syscall per event
+FLUSH_INTERVAL = 0.2
+_BUFFER_SIZE = 64 * 1024
+
+# Writes between reads of the clock for time-based rotation; the flush timer
+# also checks it, so quiet files still rotate on time
+_CLOCK_CHECK_INTERVAL = 256
+
+_SHUTDOWN_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+
+@contextmanager
+def shutdown_signals_blocked():
+    """
+    Block SIGINT and SIGTERM in the calling thread for the duration.
+
+    Threads started inside inherit the blocked mask, so the kernel delivers
+    shutdown signals to the main thread. That interrupts the main thread's
+    blocking read of the capture pipe, and the Python handler runs at once
+    rather than once the read returns. POSIX only; a no-op elsewhere.
+    """
+    if not hasattr(signal, "pthread_sigmask"):
+        yield
+        return
+    previous = signal.pthread_sigmask(signal.SIG_BLOCK, _SHUTDOWN_SIGNALS)
+    try:
+        yield
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, previous)
+
 
 class RotatingJsonlWriter:
     def __init__(
@@ -27,53 +66,153 @@ class RotatingJsonlWriter:
         self._fp: Optional[IO] = None
         self._fp_path: Optional[Path] = None
         self._next_rotate_ts = 0
+        self._rotate_deadline = 0.0  # time.monotonic() value
+        self._rotate_due = False
+        self._writes_since_clock_check = 0
         self._current_file_size = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        # Called with each new file's path when the writer opens it. It runs
+        # with the writer lock held, so it must not call back into the writer.
+        self.on_rotate: Optional[Callable[[Path], None]] = None
 
     def _new_path(self) -> Path:
         ts = datetime.now(timezone.utc).strftime(self.fmt)
         return self.dir / f"{ts}.jsonl"
 
     def _open_new(self):
+        self._cancel_flush()
         if self._fp:
             try:
                 self._fp.flush()
-                os.fsync(self._fp.fileno())
-                self._fp.close()
-                logger.info(f"Closed file: {self._fp_path}")
             except Exception as e:
-                logger.error(f"Error closing file {self._fp_path}: {e}")
+                logger.error("Error flushing file %s: %s", self._fp_path, e)
+            # fsync can take tens of milliseconds; keep it off the capture path
+            retire = threading.Thread(
+                target=self._retire_file,
+                args=(self._fp, self._fp_path),
+                name="jsonl-retire",
+                daemon=True,
+            )
+            with shutdown_signals_blocked():
+                retire.start()
 
         self._fp_path = self._new_path()
         try:
-            self._fp = open(self._fp_path, "a", encoding="utf-8")
+            self._fp = open(self._fp_path, "ab", buffering=_BUFFER_SIZE)
             self._next_rotate_ts = time.time() + self.rotate_minutes * 60
+            self._rotate_deadline = time.monotonic() + self.rotate_minutes * 60
+            self._rotate_due = False
+            self._writes_since_clock_check = 0
             self._current_file_size = 0
-            logger.info(f"Created new file: {self._fp_path}")
+            logger.info("Created new file: %s", self._fp_path)
         except Exception as e:
-            logger.error(f"Error creating file {self._fp_path}: {e}")
+            logger.error("Error creating file %s: %s", self._fp_path, e)
             raise
 
+        if self.on_rotate is not None:
+            self.on_rotate(self._fp_path)
+
+    @staticmethod
+    def _retire_file(fp: IO, path: Path):
+        """Sync and close a file the writer has rotated away from."""
+        try:
+            os.fsync(fp.fileno())
+            fp.close()
+            logger.info("Closed file: %s", path)
+        except Exception as e:
+            logger.error("Error closing file %s: %s", path, e)
+
     def _should_rotate(self) -> bool:
         if not self._fp_path or not self._fp:
             return True
-        if time.time() >= self._next_rotate_ts:
-            return True
         if self._current_file_size >= self.rotate_max_bytes:
             return True
-        return False
+        self._writes_since_clock_check += 1
+        # No pending flush timer means this is the first write after an idle
+        # spell, which may have run past the deadline
+        if (
+            self._flush_timer is None
+            or self._writes_since_clock_check >= _CLOCK_CHECK_INTERVAL
+        ):
+            self._check_rotate_deadline()
+        return self._rotate_due
+
+    def _check_rotate_deadline(self):
+        self._writes_since_clock_check = 0
+        if time.monotonic() >= self._rotate_deadline:
+            self._rotate_due = True
 
     def write_line(self, obj: dict):
-        line = json.dumps(obj, ensure_ascii=False)
+        self.write_bytes(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))
+
+    def write_bytes(self, data: bytes):
+        """Append an already serialized, newline-terminated line (see Event.to_bytes)."""
         with self._lock:
             if self._should_rotate():
                 self._open_new()
             
             try:
-                self._fp.write(line + "\n")
-                self._fp.flush()
-                self._current_file_size += len(line) + 1
+                self._fp.write(data)
+                self._current_file_size += len(data)
+                self._schedule_flush()
             except Exception as e:
-                logger.error(f"Error writing to file {self._fp_path}: {e}")
+                logger.error("Error writing to file %s: %s", self._fp_path, e)
+                raise
+
+    def _schedule_flush(self):
+        """Arrange for buffered lines to be flushed shortly; call with the lock held."""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL, self._flush_pending)
+            self._flush_timer.daemon = True
+            with shutdown_signals_blocked():
+                self._flush_timer.start()
+
+    def _flush_pending(self):
+        with self._lock:
+            self._flush_timer = None
+            if self._fp:
+                self._check_rotate_deadline()
+                try:
+                    self._fp.flush()
+                except Exception as e:
+                    logger.error("Error flushing file %s: %s", self._fp_path, e)
+
+    def _cancel_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def write_many(self, lines: List[bytes]):
+        """Append a batch of serialized lines with as few write syscalls as possible."""
+        if not lines:
+            return
+        with self._lock:
+            if self._should_rotate():
+                self._open_new()
+
+            try:
+                # A batch smaller than the file buffer just joins the buffered
+                # lines; only large batches skip the copy with writev()
+                if _HAS_WRITEV and sum(len(line) for line in lines) >= _BUFFER_SIZE:
+                    # Lines still buffered in the file object must land first
+                    self._fp.flush()
+                    fd = self._fp.fileno()
+                    for i in range(0, len(lines), _IOV_MAX):
+                        chunk = lines[i:i + _IOV_MAX]
+                        written = os.writev(fd, chunk)
+                        expected = sum(len(line) for line in chunk)
+                        if written < expected:
+                            # Short write: push the remainder through the file object
+                            self._fp.write(b"".join(chunk)[written:])
+                            self._fp.flush()
+                        self._current_file_size += expected
+                else:
+                    data = b"".join(lines)
+                    self._fp.write(data)
+                    self._current_file_size += len(data)
+                    self._schedule_flush()
+            except Exception as e:
+                logger.error("Error writing to file %s: %s", self._fp_path, e)
                 raise
 
     def get_current_file_info(self) -> Optional[dict]:
@@ -89,18 +228,78 @@ class RotatingJsonlWriter:
 
     def close(self):
         with self._lock:
+            self._cancel_flush()
             if self._fp:
                 try:
                     self._fp.flush()
                     os.fsync(self._fp.fileno())
                     self._fp.close()
                     self._fp = None
-                    logger.info(f"Writer closed, final file: {self._fp_path}")
+                    logger.info("Writer closed, final file: %s", self._fp_path)
                 except Exception as e:
-                    logger.error(f"Error closing writer: {e}")
+                    logger.error("Error closing writer: %s", e)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class QueuedEventWriter:
+    """
+    Serializes and writes events on a background thread.
+
+    The capture loop only enqueues each event, so JSON encoding and file
+    writes never hold up draining tshark's pipe. The queue is bounded; when
+    it is full, events are dropped and counted rather than blocking capture.
+    """
+
+    def __init__(self, writer: RotatingJsonlWriter, maxsize: int = 50_000):
+        self.writer = writer
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        with shutdown_signals_blocked():
+            self._thread.start()
+
+    def submit(self, event: Any):
+        """Queue an event (anything with ``to_bytes()``, e.g. Event) for writing."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        write_many = self.writer.write_many
+        stop = False
+        while not stop:
+            # Take everything queued so far and write it as one batch
+            events = [get()]
+            while events[-1] is not None and len(events) < _IOV_MAX:
+                try:
+                    events.append(get_nowait())
+                except queue.Empty:
+                    break
+            if events[-1] is None:
+                events.pop()
+                stop = True
+            lines = []
+            for event in events:
+                try:
+                    lines.append(event.to_bytes())
+                except Exception as e:
+                    logger.error("Error serializing event: %s", e)
+            try:
+                write_many(lines)
+            except Exception as e:
+                logger.error("Error writing events: %s", e)
+
+    def close(self):
+        """Write everything still queued and stop the thread; the file stays open."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            logger.warning("Event queue was full; dropped %d events", self.dropped)
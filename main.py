@@ -10,11 +10,13 @@ import os
 import sys
 import signal
 import logging
+import logging.handlers
 import time
 import argparse
+import queue
 import subprocess
+import threading
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 
 # Add current directory to path for imports
@@ -22,7 +24,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from detector.config import ConfigLoader
 from detector.network_detector import NetworkDetector
-from detector.writer import RotatingJsonlWriter
+from detector.writer import QueuedEventWriter, RotatingJsonlWriter, shutdown_signals_blocked
 from worker.llm_client import OllamaClient
 from worker.report_generator import ReportGenerator
 from quick_status import show_log_event_status
@@ -35,6 +37,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ANSI colors for console alerts, by event severity
+SEVERITY_COLOR = {
+    "HIGH": "\033[91m",  # Red
+    "MED": "\033[93m",   # Yellow
+    "LOW": "\033[94m",   # Blue
+}
+RESET_COLOR = "\033[0m"
+CONSOLE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# (epoch second, formatted time) of the last console timestamp
+_console_ts_cache = (0, "")
+
+
+def console_timestamp() -> str:
+    """Return the local time in CONSOLE_TIME_FORMAT, formatting it at most once a second."""
+    global _console_ts_cache
+    second = int(time.time())
+    if second != _console_ts_cache[0]:
+        _console_ts_cache = (second, time.strftime(CONSOLE_TIME_FORMAT, time.localtime(second)))
+    return _console_ts_cache[1]
+
+BANNER = "\n".join([
+    "\n" + "=" * 60,
+    "                    CLEARWATCH",
+    "        Clear-Text & Weak-Transport Detector",
+    "              with Local LLM Guidance",
+    "=" * 60,
+    "",
+])
+
+# Output folders, created at startup
+CLEARWATCH_FOLDERS = tuple(
+    Path("clearwatch") / name for name in ("events", "logs", "reports")
+)
+
+
+class AlertConsole:
+    """
+    Prints watch-mode alert lines from a background thread.
+
+    A slow terminal would otherwise stall the capture loop on every alert.
+    The queue is bounded; when it is full, lines are dropped and counted
+    rather than blocking capture.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="alert-console", daemon=True)
+        with shutdown_signals_blocked():
+            self._thread.start()
+
+    def print(self, line: str):
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        while True:
+            # Take everything queued so far and write it as one block, so a
+            # burst of alerts costs one write and flush instead of one each
+            lines = [get()]
+            while lines[-1] is not None:
+                try:
+                    lines.append(get_nowait())
+                except queue.Empty:
+                    break
+            stop = lines[-1] is None
+            if stop:
+                lines.pop()
+            if lines:
+                lines.append("")
+                sys.stdout.write("\n".join(lines))
+                sys.stdout.flush()
+            if stop:
+                break
+
+    def close(self):
+        """Print everything still queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            print(f"Console output dropped {self.dropped} alert lines to keep up with capture")
+
 
 class Clearwatch:
     def __init__(self, config_path: Optional[str] = None):
@@ -45,7 +134,11 @@ class Clearwatch:
         self.llm_client: Optional[OllamaClient] = None
         self.report_generator: Optional[ReportGenerator] = None
         self.api_process: Optional[subprocess.Popen] = None
+        self.log_listener: Optional[logging.handlers.QueueListener] = None
         self.running = False
+        # Set while buffered events and logs are being written out; signals
+        # then must not interrupt the cleanup
+        self._cleaning_up = False
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -53,27 +146,33 @@ class Clearwatch:
         
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
-        logger.info(f"Received signal {signum}, shutting down...")
+        if self._cleaning_up:
+            logger.info("Received signal %s during cleanup; finishing cleanup first", signum)
+            return
+        logger.info("Received signal %s, shutting down...", signum)
         self.running = False
         if self.api_process:
             self.api_process.terminate()
+        # A capture blocked on tshark's pipe only notices self.running once
+        # another event arrives, so end the capture itself
+        if self.detector and self.detector.stop_capture():
+            return
+        # Otherwise we're at a prompt or between modes; interrupt it the way
+        # Ctrl+C would without this handler
+        raise KeyboardInterrupt
         
     def _create_folders(self):
         """Create the clearwatch folder structure."""
-        base_dir = Path("clearwatch")
-        base_dir.mkdir(exist_ok=True)
-        
-        # Create subdirectories
-        (base_dir / "events").mkdir(exist_ok=True)
-        (base_dir / "logs").mkdir(exist_ok=True)
-        (base_dir / "reports").mkdir(exist_ok=True)
+        # Creating the subdirectories with parents=True also creates the base
+        for folder in CLEARWATCH_FOLDERS:
+            folder.mkdir(parents=True, exist_ok=True)
         
         logger.info("Created clearwatch folder structure")
         
     def _setup_logging(self):
         """Setup file logging."""
+        # _create_folders has already made the logs directory
         log_file = Path("clearwatch/logs/clearwatch.log")
-        log_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Add file handler
         file_handler = logging.FileHandler(log_file)
@@ -84,10 +183,26 @@ class Clearwatch:
         )
         file_handler.setFormatter(file_formatter)
         
-        # Add to root logger
-        logging.getLogger().addHandler(file_handler)
-        logger.info(f"Logging to file: {log_file}")
+        # Add to root logger through a queue, so the capture loop never waits
+        # on the log file; a listener thread does the disk writes
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(logging.INFO)
+        logging.getLogger().addHandler(queue_handler)
+        self.log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        with shutdown_signals_blocked():
+            self.log_listener.start()
+        logger.info("Logging to file: %s", log_file)
         
+    def _quiet_console_logging(self):
+        """Show only warnings and errors on the console log handler."""
+        for handler in logging.getLogger().handlers:
+            # basicConfig's stderr handler; FileHandler subclasses StreamHandler
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.WARNING)
+
     def _load_configuration(self):
         """Load and validate configuration."""
         try:
@@ -95,7 +210,7 @@ class Clearwatch:
             self.config = ConfigLoader(config_dir=config_dir)
             logger.info("Configuration loaded successfully")
         except Exception as e:
-            logger.error(f"Failed to load configuration: {e}")
+            logger.error("Failed to load configuration: %s", e)
             sys.exit(1)
             
     def _initialize_components(self, interface_override: Optional[str] = None):
@@ -124,7 +239,7 @@ class Clearwatch:
                 logger.info("LLM worker is disabled in configuration.")
             
         except Exception as e:
-            logger.error(f"Failed to initialize components: {e}")
+            logger.error("Failed to initialize components: %s", e)
             sys.exit(1)
 
     def _start_api_server(self):
@@ -138,20 +253,15 @@ class Clearwatch:
                        "--port", str(api_config.get("port", 8088))]
                 
                 self.api_process = subprocess.Popen(cmd)
-                logger.info(f"API server started in background (PID: {self.api_process.pid})")
+                logger.info("API server started in background (PID: %s)", self.api_process.pid)
                 print(f"INFO: API server running at http://{api_config.get('host', '127.0.0.1')}:{api_config.get('port', 8088)}")
             except Exception as e:
-                logger.error(f"Failed to start API server: {e}")
+                logger.error("Failed to start API server: %s", e)
                 print(f"ERROR: Could not start the API server: {e}")
 
     def _print_banner(self):
         """Print program banner."""
-        print("\n" + "="*60)
-        print("                    CLEARWATCH")
-        print("        Clear-Text & Weak-Transport Detector")
-        print("              with Local LLM Guidance")
-        print("="*60)
-        print()
+        print(BANNER)
         
     def _print_mode_selection(self):
         """Print mode selection menu."""
@@ -259,7 +369,10 @@ class Clearwatch:
         print("WATCH MODE - Network Traffic Monitoring")
         print("="*50)
         
-        # Select interface if not provided
+        # Select interface if not provided; without a terminal to ask on, use
+        # the one the detector was configured with
+        if not interface_override and not sys.stdin.isatty():
+            interface_override = self.detector.interface
         if not interface_override:
             interface_override = self._select_network_interface()
             if not interface_override:
@@ -269,9 +382,9 @@ class Clearwatch:
         # Reinitialize detector with selected interface
         try:
             self.detector = NetworkDetector(self.config, interface_override)
-            logger.info(f"Network detector reinitialized with interface: {interface_override}")
+            logger.info("Network detector reinitialized with interface: %s", interface_override)
         except Exception as e:
-            logger.error(f"Failed to reinitialize detector: {e}")
+            logger.error("Failed to reinitialize detector: %s", e)
             print(f"❌ Error: {e}")
             return
         
@@ -280,12 +393,13 @@ class Clearwatch:
         
         # Print startup information
         tshark_path = self.config.get("detector.tshark_path")
-        
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: Clearwatch started - monitoring interface: {interface_override}")
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: Using tshark: {tshark_path}")
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: Events directory: clearwatch/events/")
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: Log file: clearwatch/logs/clearwatch.log")
-        print()
+        ts = console_timestamp()
+        print(
+            f"[{ts}] INFO: Clearwatch started - monitoring interface: {interface_override}\n"
+            f"[{ts}] INFO: Using tshark: {tshark_path}\n"
+            f"[{ts}] INFO: Events directory: clearwatch/events/\n"
+            f"[{ts}] INFO: Log file: clearwatch/logs/clearwatch.log\n"
+        )
         
         # Start monitoring
         self.running = True
@@ -293,48 +407,58 @@ class Clearwatch:
         status_interval = 30  # seconds
         start_time = time.time()
         last_status_time = start_time
+        console = AlertConsole()
+        # Bound once; the loop below runs for every event
+        writer = self.writer
+        event_writer = QueuedEventWriter(writer)
+        submit_event = event_writer.submit
+        console_print = console.print
+        severity_color_for = SEVERITY_COLOR.get
+        # Announce each new event file as the writer opens it
+        writer.on_rotate = lambda path: console_print(
+            f"[{console_timestamp()}] ROTATION: Now writing to {path}"
+        )
         
         try:
             for event in self.detector.start_capture():
                 if not self.running:
                     break
 
-                current_time = time.time()
-                elapsed = current_time - start_time
-                if event_count == 0 and current_time - last_status_time >= status_interval:
-                    print(
-                        f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: No detections yet; capture is active ({int(elapsed)}s elapsed)."
-                    )
-                    last_status_time = current_time
+                if event_count == 0:
+                    current_time = time.time()
+                    elapsed = current_time - start_time
+                    if current_time - last_status_time >= status_interval:
+                        console_print(
+                            f"[{console_timestamp()}] INFO: No detections yet; capture is active ({int(elapsed)}s elapsed)."
+                        )
+                        last_status_time = current_time
 
-                # Write event to file
-                self.writer.write_line(event.to_jsonable())
+                # Serialized and written to file on the writer thread
+                submit_event(event)
                 event_count += 1
                 
                 # Print console alert
-                severity_color = {
-                    "HIGH": "\033[91m",  # Red
-                    "MED": "\033[93m",   # Yellow
-                    "LOW": "\033[94m"    # Blue
-                }.get(event.severity, "")
-                reset_color = "\033[0m"
-                
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {severity_color}{event.severity} ALERT{reset_color}: {event.rule} detected on {event.dst_ip}:{event.dst_port}")
-                
-                # Print file rotation info
-                file_info = self.writer.get_current_file_info()
-                if file_info:
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ROTATION: Current file: {file_info['path']} ({file_info['size_bytes']} bytes)")
-                    
+                severity = event.severity
+                console_print(f"[{console_timestamp()}] {severity_color_for(severity, '')}{severity} ALERT{RESET_COLOR}: {event.rule} detected on {event.dst_ip}:{event.dst_port}")
+
         except KeyboardInterrupt:
-            print("\nStopping network monitoring...")
+            console.print("\nStopping network monitoring...")
         except Exception as e:
-            logger.error(f"Error in watch mode: {e}")
-            print(f"Error: {e}")
+            logger.error("Error in watch mode: %s", e)
+            console.print(f"Error: {e}")
         finally:
-            if self.writer:
-                self.writer.close()
+            self._cleaning_up = True
+            try:
+                event_writer.close()
+                writer.on_rotate = None
+                console.close()
+                if self.writer:
+                    self.writer.close()
+            finally:
+                self._cleaning_up = False
             print(f"\nWatch mode completed. Total events captured: {event_count}")
+            if event_writer.dropped:
+                print(f"Events dropped because the writer fell behind: {event_writer.dropped}")
             show_log_event_status()
             
     def _analysis_mode(self):
@@ -356,6 +480,14 @@ class Clearwatch:
     def run(self, direct_mode: Optional[str] = None, interface: Optional[str] = None):
         """Main program execution."""
         try:
+            if direct_mode is None and not sys.stdin.isatty():
+                # The menu would block forever on a stdin nobody writes to
+                logger.error("No --mode given and stdin is not a terminal; use --mode watch or --mode analysis")
+                sys.exit(2)
+            if direct_mode:
+                # Headless runs keep INFO records in the log file only
+                self._quiet_console_logging()
+
             # Setup
             self._create_folders()
             self._setup_logging()
@@ -393,15 +525,21 @@ class Clearwatch:
                         break
                         
         except Exception as e:
-            logger.error(f"Fatal error: {e}")
+            logger.error("Fatal error: %s", e)
             print(f"Fatal error: {e}")
             sys.exit(1)
         finally:
+            # The process is exiting; later signals must not cut this short
+            self._cleaning_up = True
             if self.writer:
                 self.writer.close()
             if self.api_process:
                 self.api_process.terminate()
                 logger.info("API server terminated.")
+            if self.log_listener:
+                # Writes out any records still queued
+                self.log_listener.stop()
+                self.log_listener = None
 
 
 def main():
@@ -1,5 +1,6 @@
 import requests
 import logging
+import threading
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -13,11 +14,23 @@ class OllamaClient:
         self.model = model
         self.api_url = api_url
         self.timeout = 60  # seconds
+        # A session per thread, so repeated calls reuse a connection to Ollama
+        # instead of opening a new one each time; requests.Session isn't
+        # documented as thread-safe, and the API calls in from worker threads
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """The calling thread's HTTP session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
 
     def is_available(self) -> bool:
         """Check if the Ollama service is running and available."""
         try:
-            response = requests.head(self.api_url.replace("/api/generate", ""), timeout=5)
+            response = self.session.head(self.api_url.replace("/api/generate", ""), timeout=5)
             return response.status_code == 200
         except requests.RequestException:
             return False
@@ -40,7 +53,7 @@ class OllamaClient:
         
         try:
             logger.info(f"Sending prompt to Ollama model: {self.model}")
-            response = requests.post(self.api_url, json=payload, timeout=self.timeout)
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             
             data = response.json()
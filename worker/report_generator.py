@@ -1,3 +1,4 @@
+import os
 import orjson
 import logging
 from pathlib import Path
@@ -36,14 +37,19 @@ class ReportGenerator:
             logger.warning(f"Events directory not found: {self.events_dir}")
             return []
 
-        event_files = sorted(self.events_dir.glob("*.jsonl"), reverse=True)
+        # scandir entries carry their stat results on Windows, and on every
+        # platform avoid building a Path per directory entry
+        with os.scandir(self.events_dir) as it:
+            event_files = [entry for entry in it if entry.name.endswith(".jsonl")]
+        event_files.sort(key=lambda entry: entry.name, reverse=True)
         
         logger.info(f"Scanning for events in the last {window_minutes} minutes...")
 
-        for file_path in event_files:
+        for entry in event_files:
+            file_path = Path(entry.path)
             try:
                 # Check if file is within the time window
-                file_mod_time = datetime.fromtimestamp(file_path.stat().st_mtime, tz=timezone.utc)
+                file_mod_time = datetime.fromtimestamp(entry.stat().st_mtime, tz=timezone.utc)
                 if file_mod_time < time_window:
                     break  # Files are sorted, so we can stop here
 